@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+aec – Adaptive filters for acoustic echo cancellation.
+
+Importing the package does no work: the public names below are resolved
+on first access, which imports only the submodule that defines them
+(and NumPy). Optional dependencies are deferred further still: Numba is
+imported on the first kernel lookup (see kernels.py) and nothing here
+imports SciPy, matplotlib or sounddevice.
+
+    from aec import lms_filter_batch        # imports aec.lms only
+    import aec.ring_buffer                  # submodules work as usual
+
+Submodules
+----------
+- lms:          LMS batch sweep and streaming filters.
+- nlms:         NLMS (time and frequency domain) and streaming NLMS.
+- apa:          affine projection (APA / fast APA) batch filter.
+- rls:          RLS (conventional and fast transversal) and streaming RLS.
+- lms_parallel: process-pool µ sweeps.
+- coeff_cache:  persistent warm-start cache for streaming filters.
+- ring_buffer:  lock-free SPSC audio FIFO.
+- chunked:      chunked / out-of-core signal processing helpers.
+- kernels:      optional compiled inner loops.
+"""
+
+import importlib
+
+# public name -> defining submodule
+_EXPORTS = {
+    "lms_filter_batch": "lms",
+    "StreamingLMSFilter": "lms",
+    "StreamingMISOLMSFilter": "lms",
+    "StreamingLMSFilterBank": "lms",
+    "nlms_filter": "nlms",
+    "ipnlms_filter": "nlms",
+    "mmax_nlms_filter": "nlms",
+    "sm_nlms_filter": "nlms",
+    "fdnlms_filter": "nlms",
+    "StreamingNLMSFilter": "nlms",
+    "apa_filter": "apa",
+    "rls_filter": "rls",
+    "StreamingRLSFilter": "rls",
+    "lms_filter_batch_parallel": "lms_parallel",
+    "CoefficientCache": "coeff_cache",
+    "CacheWriter": "coeff_cache",
+    "fingerprint": "coeff_cache",
+    "RingBuffer": "ring_buffer",
+}
+
+_SUBMODULES = frozenset((
+    "lms", "nlms", "apa", "rls", "lms_parallel", "coeff_cache",
+    "ring_buffer", "chunked", "kernels",
+))
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | _SUBMODULES)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+chunked.py – Fixed-size chunking for out-of-core adaptive filtering.
+
+Exports
+-------
+- ChunkReader: serves consecutive windows of a (desired, reference)
+  pair from in-memory arrays, np.memmap files or iterators of chunks,
+  each window prefixed with the tap history the filter needs.
+- run_chunked: drive a sample-wise filter kernel over those windows
+  while its state (taps, P matrix, …) carries across chunk boundaries.
+- channel_shape: leading (channel) shape of a pair of signals.
+
+Signals may be 1-D, or 2-D (C, N) for C independent channels; time
+always runs along the last axis. A filter with M taps that starts
+adapting at sample M only ever looks M samples back, so running it
+window by window over [start - M, stop) gives exactly the same result
+as one run over the whole signal.
+"""
+
+from collections.abc import Iterator
+from typing import Callable, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+Signal = Union[np.ndarray, Iterable[np.ndarray]]
+
+
+class ChunkReader:
+    """
+    Read a (desired, reference) pair window by window.
+
+    Attributes
+    ----------
+    length : int or None
+        Total signal length (last axis), or None for iterator inputs.
+    shape : tuple or None
+        Full signal shape, or None for iterator inputs.
+    lead : tuple
+        Leading (channel) shape: () for 1-D signals, (C,) for 2-D.
+    chunked : bool
+        True if the input should be processed in chunks (np.memmap or
+        iterator inputs, or an explicit chunk_size).
+    chunk_size : int
+        Window size to use when chunked.
+    total : int
+        Number of samples seen so far (final length for iterators).
+    """
+
+    def __init__(
+        self,
+        desired: Signal,
+        reference: Signal,
+        history: int,
+        limit: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        dtype: Optional[np.dtype] = None
+    ) -> None:
+        """
+        Parameters
+        ----------
+        desired, reference : np.ndarray, np.memmap or iterator of chunks
+            The two signals, shape (N,) or (C, N). Iterators must yield
+            equally long chunks pairwise; any chunk length is accepted.
+        history : int
+            Samples preceding each window (the filter length M).
+        limit : int, optional
+            Stop after this many samples (num_iterations).
+        chunk_size : int, optional
+            Window size; default DEFAULT_CHUNK_SIZE when chunked.
+        dtype : np.dtype, optional
+            Cast every window to this dtype (default: keep input dtype).
+        """
+        self.history = history
+        self.dtype = dtype
+        self.chunk_size = DEFAULT_CHUNK_SIZE if chunk_size is None else chunk_size
+        if self.chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+
+        if isinstance(desired, Iterator) or isinstance(reference, Iterator):
+            self.length = None
+            self.shape = None
+            self.chunked = True
+            self._chunks = zip(desired, reference)
+            self._d = np.zeros(0)
+            self._u = np.zeros(0)
+            self._limit = limit
+            self.total = 0
+            self._more()  # the first chunk tells the channel shape
+            self.lead = self._d.shape[:-1]
+        else:
+            if not isinstance(desired, np.ndarray):
+                desired = np.asarray(desired)
+            if not isinstance(reference, np.ndarray):
+                reference = np.asarray(reference)
+            if desired.shape != reference.shape:
+                raise ValueError("desired and reference signals differ in shape")
+            self.length = desired.shape[-1]
+            self.shape = desired.shape
+            self.lead = desired.shape[:-1]
+            self.chunked = (chunk_size is not None
+                            or isinstance(desired, np.memmap)
+                            or isinstance(reference, np.memmap))
+            self._desired = desired
+            self._reference = reference
+            if limit is None or limit > self.length:
+                limit = self.length
+            self._limit = limit
+            self.total = self.length
+
+        self._pos = history  # index of the next new sample
+
+    def read(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return up to n new samples of each signal, preceded by history.
+
+        Both windows have history + m samples along the last axis, with
+        0 < m <= n, or are empty once the signals (or the limit) are
+        exhausted.
+        """
+        if self.length is None:
+            return self._read_iter(n)
+
+        stop = min(self._pos + n, self._limit)
+        if stop <= self._pos:
+            return np.zeros(0), np.zeros(0)
+        start = self._pos - self.history
+        self._pos = stop
+        # np.asarray maps memmap slices without reading the whole file
+        return (np.asarray(self._desired[..., start:stop], dtype=self.dtype),
+                np.asarray(self._reference[..., start:stop], dtype=self.dtype))
+
+    def _read_iter(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """read() for iterator inputs; buffers whole chunks as needed."""
+        want = self.history + n
+        while self._d.shape[-1] < want and self._more():
+            pass
+        m = self._d.shape[-1] - self.history
+        if self._limit is not None:
+            m = min(m, self._limit - self._pos)
+        m = min(m, n)
+        if m <= 0:
+            return np.zeros(0), np.zeros(0)
+
+        d = self._d[..., :self.history + m]
+        u = self._u[..., :self.history + m]
+        self._d = self._d[..., m:]
+        self._u = self._u[..., m:]
+        self._pos += m
+        return d, u
+
+    def _more(self) -> bool:
+        """Append the next chunk pair to the buffers; False when done."""
+        if self._limit is not None and self.total >= self._limit:
+            return False
+        try:
+            d, u = next(self._chunks)
+        except StopIteration:
+            return False
+        d = np.asarray(d, dtype=self.dtype)
+        u = np.asarray(u, dtype=self.dtype)
+        if d.shape != u.shape:
+            raise ValueError("desired and reference chunks differ in shape")
+        if self._limit is not None:
+            d = d[..., :self._limit - self.total]
+            u = u[..., :self._limit - self.total]
+        # keep the chunks' own dtype rather than promoting to the buffer's
+        if self._d.shape[-1]:
+            d = np.concatenate((self._d, d), axis=-1)
+            u = np.concatenate((self._u, u), axis=-1)
+        self.total += d.shape[-1] - self._d.shape[-1]
+        self._d, self._u = d, u
+        return True
+
+
+def channel_shape(desired: Signal, filter_coeff: np.ndarray) -> Tuple[int, ...]:
+    """
+    Leading shape of the per-channel filter state: () or (C,).
+
+    Taken from filter_coeff when it is 2-D (C, M), otherwise from the
+    signal itself; iterator inputs cannot be inspected without being
+    consumed, so (C, n) chunks need (C, M) taps.
+    """
+    if np.ndim(filter_coeff) > 1:
+        return np.shape(filter_coeff)[:-1]
+    if isinstance(desired, Iterator):
+        return ()
+    return np.shape(desired)[:-1]
+
+
+def run_chunked(
+    run: Callable[..., None],
+    desired: Signal,
+    reference: Signal,
+    history: int,
+    state: tuple,
+    *,
+    chunk_size: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+    dtype: type = np.float64,
+    input_dtype: Optional[np.dtype] = None
+) -> np.ndarray:
+    """
+    Drive a filter kernel over (desired, reference), chunk by chunk.
+
+    Parameters
+    ----------
+    run : callable
+        Kernel run(desired, reference, *state, e) that adapts from sample
+        `history` to the end of its inputs, updating the arrays in state
+        in place and writing the error of sample n to e[n].
+    desired, reference : np.ndarray, np.memmap or iterator of chunks
+        Input signals (see ChunkReader).
+    history : int
+        Filter length M.
+    state : tuple
+        Extra kernel arguments (taps, step size, P matrix, …).
+    chunk_size : int, optional
+        Chunk length; see ChunkReader.
+    out : np.ndarray, optional
+        Preallocated error buffer shaped like the signals (e.g. a memmap).
+    dtype : type
+        Error dtype when out is not given.
+    input_dtype : np.dtype, optional
+        Cast the signal windows to this dtype before running the kernel.
+
+    Returns
+    -------
+    e : np.ndarray
+        Error signal shaped like the inputs, zero for the first `history`
+        samples.
+    """
+    reader = ChunkReader(desired, reference, history, chunk_size=chunk_size,
+                         dtype=input_dtype)
+
+    e = None
+    if reader.length is not None:
+        shape = reader.shape
+        if out is None:
+            e = np.zeros(shape, dtype=dtype)
+        elif out.shape != shape:
+            raise ValueError(f"out must have shape {shape}, got {out.shape}")
+        else:
+            e = out
+            e[..., :history] = 0
+
+    if not reader.chunked:
+        d, u = reader.read(reader.length)
+        if d.shape[-1]:
+            run(d, u, *state, e)
+        return e
+
+    size = reader.chunk_size
+    scratch = None
+    pieces = []
+    start = history
+    while True:
+        d, u = reader.read(size)
+        n = d.shape[-1] - history
+        if n <= 0:
+            break
+        if scratch is None:
+            scratch = np.zeros(d.shape[:-1] + (history + size,),
+                               dtype=dtype if e is None else e.dtype)
+        e_win = scratch[..., :history + n]
+        run(d, u, *state, e_win)
+        if e is None:
+            pieces.append(e_win[..., history:].copy())
+        else:
+            e[..., start:start + n] = e_win[..., history:]
+        start += n
+
+    if e is None:
+        lead = () if scratch is None else scratch.shape[:-1]
+        head = np.zeros(lead + (min(history, reader.total),), dtype=dtype)
+        e = np.concatenate([head] + pieces, axis=-1)
+        if out is not None:
+            out[..., :e.shape[-1]] = e
+            e = out[..., :e.shape[-1]]
+    return e
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+coeff_cache.py – Persistent warm-start cache for streaming LMS filters.
+
+An echo path depends on the loudspeaker, the microphone and the room, so
+taps that converged in one session are a far better starting point for
+the next session on the same setup than zeros.
+
+Exports
+-------
+- fingerprint: stable cache key for an audio device / room setup.
+- CoefficientCache: on-disk store of StreamingLMSFilter (and subclass)
+  snapshots (to_bytes format), one file per key, with LRU eviction under an entry
+  count and a total size cap.
+- CacheWriter: background thread that writes a filter's snapshot back to
+  the cache at most once per interval, so the audio thread only pays for
+  copying the state, never for file I/O.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from typing import Optional
+
+from .kernels import get_kernel
+from .lms import StreamingLMSFilter
+
+_SUFFIX = ".lms"
+
+
+def fingerprint(*parts, **settings) -> str:
+    """
+    Cache key for a setup: hash of the given parts (e.g. input and output
+    device names, a room label) and settings (sample rate, taps, …).
+
+    Settings that change the filter layout belong in the key, so that a
+    cache hit is always compatible with the filter being seeded.
+    """
+    blob = json.dumps([list(map(str, parts)), settings], sort_keys=True,
+                      default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:20]
+
+
+def default_cache_dir() -> str:
+    """$XDG_CACHE_HOME/aec-lms, or ~/.cache/aec-lms."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "aec-lms")
+
+
+class CoefficientCache:
+    """
+    Directory of filter snapshots keyed by setup fingerprint.
+
+    Recency is the file modification time: reading an entry touches it,
+    and after every write the least recently used entries are deleted
+    until at most max_entries files and max_bytes bytes remain. Writes
+    go through StreamingLMSFilter.save, which replaces files atomically,
+    so a reader never sees a half-written snapshot.
+
+    Attributes
+    ----------
+    directory : str
+        Cache directory (created on demand).
+    max_entries : int
+        Maximum number of cached setups.
+    max_bytes : int
+        Maximum total size of the cache in bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        *,
+        max_entries: int = 16,
+        max_bytes: int = 64 << 20
+    ) -> None:
+        self.directory = default_cache_dir() if directory is None else directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def load(
+        self,
+        key: str,
+        backend: str = "auto",
+        cls: type = StreamingLMSFilter
+    ) -> Optional[StreamingLMSFilter]:
+        """
+        Return the cached filter for key, decoded as cls (StreamingLMSFilter
+        or a subclass such as StreamingNLMSFilter), or None on a miss.
+
+        An entry that cannot be read, or holds a snapshot of another
+        filter kind, is a miss and stays in place; one that cannot be
+        decoded (truncated, bad header codes, …) is removed. An invalid
+        backend raises as for the filter constructors.
+        """
+        get_kernel("lms_time", backend)  # validates backend, before any I/O
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+            except OSError:
+                return None
+            if cls._snapshot_kind(data) not in (None, cls._KIND):
+                return None
+            try:
+                filt = cls.from_bytes(data, backend=backend)
+            except (ValueError, struct.error):  # corrupt: drop the entry
+                self._remove(path)
+                return None
+            os.utime(path)  # mark as most recently used
+        return filt
+
+    def seed(self, filt: StreamingLMSFilter, key: str) -> bool:
+        """
+        Warm-start filt from the entry for key.
+
+        An entry of another filter kind counts as a miss and is kept. The
+        cached taps and history are copied into filt; its own settings (mu, safe, …) are kept. Returns
+        False (leaving filt untouched) on a miss or if the cached filter
+        has a different layout.
+        """
+        cached = self.load(key, backend=filt.backend, cls=type(filt))
+        if cached is None:
+            return False
+        cached_state = cached.get_state()
+        if (cached_state["num_taps"], cached_state["engine"],
+                cached_state["block_size"]) != (
+            len(filt.coeffs), filt.engine, filt.block_size
+        ):
+            return False
+        state = filt.get_state()
+        for name in cached._state_arrays():
+            state[name] = cached_state[name]
+        filt.set_state(state)
+        return True
+
+    def store(self, key: str, filt: StreamingLMSFilter) -> None:
+        """Write filt's current state under key (blocking)."""
+        self.store_bytes(key, filt.to_bytes())
+
+    def store_bytes(self, key: str, snapshot: bytes) -> None:
+        """Write a to_bytes() snapshot under key, then enforce the caps."""
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as fh:
+                fh.write(snapshot)
+            os.replace(tmp, path)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries beyond the caps."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort(reverse=True)  # most recent first
+
+        total = 0
+        for i, (_, size, path) in enumerate(entries):
+            total += size
+            # the newest entry always survives, even if it alone is too big
+            if i and (i >= self.max_entries or total > self.max_bytes):
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class CacheWriter:
+    """
+    Periodic write-back of a filter's state on a background thread.
+
+    The audio thread calls offer(filt) after each block; at most once per
+    interval this copies the filter state (to_bytes, a few microseconds
+    for thousands of taps) and hands it to the writer thread, which does
+    the file I/O. Only the newest pending snapshot is kept.
+    """
+
+    def __init__(
+        self,
+        cache: CoefficientCache,
+        key: str,
+        interval: float = 10.0
+    ) -> None:
+        self.cache = cache
+        self.key = key
+        self.interval = interval
+        self._last = time.monotonic()
+        self._pending: Optional[bytes] = None
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = threading.Thread(
+            target=self._run, name="lms-cache-writer", daemon=True
+        )
+        self._thread.start()
+
+    def offer(self, filt: StreamingLMSFilter) -> bool:
+        """
+        Queue a snapshot of filt if the interval has elapsed; returns True
+        if one was queued. Call from the thread that owns filt.
+        """
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return False
+        self._last = now
+        self._pending = filt.to_bytes()
+        self._wake.set()
+        return True
+
+    def close(self, filt: Optional[StreamingLMSFilter] = None) -> None:
+        """Stop the writer, after writing filt's final state if given."""
+        if filt is not None:
+            self._pending = filt.to_bytes()
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            snapshot, self._pending = self._pending, None
+            if snapshot is not None:
+                try:
+                    self.cache.store_bytes(self.key, snapshot)
+                except OSError as exc:
+                    print(f"\n[coeff cache] write failed: {exc}")
+            if self._stop:
+                return
@@ -0,0 +1,1495 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lms.py – Minimal LMS adaptive filter, with both batch and streaming APIs.
+
+Exports
+-------
+- lms_filter_batch: run LMS over entire signals, optionally sweep µ.
+  Supports a sample-wise time-domain engine, a block LMS engine built on
+  matrix-vector products, and an overlap-save frequency-domain (FDAF)
+  engine for long filters.
+- StreamingLMSFilter: stateful filter for real-time or block processing,
+  sample-wise, as block LMS, or as a partitioned-block frequency-domain
+  (MDF) filter for long echo tails at small block latency. Its state can
+  be snapshotted (get_state/set_state, to_bytes/from_bytes, save/load,
+  pickle) so a session resumes with converged taps.
+- StreamingMISOLMSFilter: multi-input single-output variant that cancels
+  the echo of several loudspeaker channels from one microphone.
+- StreamingLMSFilterBank: many concurrent streaming filters stored as
+  struct-of-arrays and adapted together in one vectorized call per block.
+"""
+
+import os
+import struct
+import numpy as np
+from functools import partial
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Optional, Sequence, Tuple, Union
+
+from .chunked import ChunkReader
+from .kernels import get_kernel
+
+
+def lms_filter_batch(
+    desired_signal: np.ndarray,
+    reference_input: np.ndarray,
+    filter_coeff: np.ndarray,
+    step_size: Union[float, Sequence[float]],
+    *,
+    num_iterations: Optional[int] = None,
+    return_error: bool = True,
+    safe: bool = False,
+    engine: str = "time",
+    block_size: Optional[int] = None,
+    prune_interval: Optional[int] = None,
+    prune_margin: float = 4.0,
+    backend: str = "auto",
+    out: Optional[np.ndarray] = None,
+    chunk_size: Optional[int] = None,
+    dtype: Optional[np.dtype] = None,
+    error_bound: Optional[float] = None,
+    stats: Optional[dict] = None
+) -> Tuple[Optional[np.ndarray], np.ndarray, float]:
+    """
+    Batch LMS adaptive filter.
+
+    Parameters
+    ----------
+    desired_signal : np.ndarray, shape (N,) or (C, N)
+        Target signal d[n]. May be an np.memmap, or an iterator of
+        chunks (see chunk_size). A 2-D input holds C independent
+        channels, each adapted by its own filter in the same vectorized
+        pass over the samples.
+    reference_input : np.ndarray, shape (N,) or (C, N)
+        Echo/source signal u[n], of the same kind and shape as
+        desired_signal.
+    filter_coeff : np.ndarray, shape (M,) or (C, M)
+        Initial filter taps f[0], shared by or given per channel.
+    step_size : float or sequence of floats
+        If a float: use single µ. If sequence: adapt one filter per µ
+        in a single pass over the signals and pick the one yielding
+        minimal total squared error (per channel for 2-D input).
+    num_iterations : int, optional
+        Number of samples to run (default = len(desired_signal)).
+    return_error : bool
+        If True, returns the full error signal e[n]. If False, no
+        signal-length buffer is allocated: the signals are processed in
+        fixed-size segments and only the running error energy of each
+        µ is kept, so memory stays O(M) for any signal length.
+    safe : bool
+        If True, clip each sample error to ±1e4 to prevent overflow.
+    engine : {"time", "block", "fdaf"}
+        "time" adapts sample by sample (O(M) per sample). "block" is a
+        block LMS (delayed update): the outputs of each block_size-sample
+        block come from one matrix-vector product over a strided window
+        view of the reference, followed by one combined gradient update.
+        "fdaf" runs the same block LMS with block length M through an
+        overlap-save frequency-domain filter with FFT size 2M (O(log M)
+        per sample). The block engines apply one summed gradient per
+        block, so they track the time-domain engine closely for small µ
+        but are not sample-for-sample identical.
+    block_size : int, optional
+        Block length L for engine="block" (default M).
+    prune_interval : int, optional
+        When sweeping, compare the running error energy of all remaining
+        µ candidates every prune_interval samples (rounded up to a whole
+        number of blocks for the block engines) and drop those that
+        have diverged (NaN/inf energy) or whose energy exceeds
+        prune_margin times the current best. Default: no pruning, every
+        µ runs over the whole signal.
+    prune_margin : float
+        Losing factor for prune_interval; larger values prune less
+        aggressively.
+    backend : {"auto", "numpy", "numba"}
+        Kernel backend for the time-domain engine (see kernels.py).
+        "auto" uses a cached Numba JIT kernel when Numba is installed.
+    out : np.ndarray, shape (N,) or (C, N), optional
+        Caller-supplied buffer (e.g. a preallocated array or np.memmap)
+        that receives the error signal and is returned as err. With a
+        single µ the filter writes into it directly; when sweeping, the
+        per-µ errors are still held until the best µ is known.
+    chunk_size : int, optional
+        Process the signals in windows of chunk_size new samples
+        (rounded up to whole blocks), carrying taps and tap history
+        across window boundaries. np.memmap and iterator inputs are
+        always chunked (default chunk 65536). Results are identical to
+        a single in-memory run; for iterators the error signal is
+        assembled at the end, so pair them with return_error=False (or
+        pass memmaps with out=) to stay out of core.
+    dtype : np.float32 or np.float64, optional
+        Working precision of taps, signals and error. np.float32 halves
+        memory traffic (inputs are cast window by window). Default: the
+        historical mix of float64 taps and a float32 error signal.
+    error_bound : float, optional
+        Set-membership adaptation: samples whose error magnitude is at
+        most error_bound skip the tap update entirely, and the others
+        adapt on the part of the error beyond the bound,
+        e - error_bound·sign(e). In a converged call most samples stay
+        inside the bound (pick it near the noise floor). The block
+        engines skip a block's gradient when no sample in it exceeds
+        the bound. Default: update on every sample.
+    stats : dict, optional
+        Filled with the update statistics of the returned µ: "samples"
+        (adapted samples per channel), "updates" (samples that updated
+        the taps; an array of shape (C,) for 2-D input) and
+        "update_ratio" (updates / samples). The block engines count
+        every sample of a block whose gradient was applied, since one
+        sample beyond the bound costs the whole block update.
+
+    Returns
+    -------
+    err : np.ndarray or None
+        Error signal array (or None if return_error=False).
+    best_coeff : np.ndarray, shape (M,) or (C, M)
+        Adapted filter taps.
+    best_mu : float or np.ndarray of shape (C,)
+        The µ actually used (or best µ if sweeping).
+
+    A 1-D run in which every µ diverged returns (None, filter_coeff,
+    step_size[0]); in a 2-D run such a channel keeps its initial taps
+    and gets a NaN error row.
+    """
+    M = np.shape(filter_coeff)[-1]
+    reader = ChunkReader(desired_signal, reference_input, M,
+                         num_iterations, chunk_size, dtype=dtype)
+    N = reader.length  # None for iterator inputs
+    batched = len(reader.lead) == 1
+    C = reader.lead[0] if batched else 1
+
+    # unify step_size to sequence
+    mu_list = [step_size] if np.ndim(step_size) == 0 else list(step_size)
+
+    if engine not in _ENGINES:
+        raise ValueError(
+            f"unknown engine {engine!r}; expected one of {sorted(_ENGINES)}"
+        )
+    run = _ENGINES[engine]
+    bound = 0.0 if error_bound is None else float(error_bound)
+    if bound < 0:
+        raise ValueError("error_bound must be non-negative")
+    block = 1
+    if engine == "time":
+        run = get_kernel("lms_time", backend) or run
+    elif engine == "block":
+        block = M if block_size is None else block_size
+        if block <= 0:
+            raise ValueError("block_size must be positive")
+        run = partial(run, block_size=block)
+    else:
+        block = M
+
+    # every (channel, µ) pair adapts its own row of taps; all µ of a
+    # channel share that channel's reference window
+    K = len(mu_list)
+    work = np.dtype(np.float64 if dtype is None else dtype)
+    err_dtype = np.dtype(np.float32 if dtype is None else dtype)
+    mus = np.asarray(mu_list, dtype=work)
+    coeffs = np.broadcast_to(
+        np.asarray(filter_coeff).astype(work)[..., None, :], (C, K, M)
+    ).copy()
+
+    shape = reader.shape
+    if out is not None and N is not None and out.shape != shape:
+        raise ValueError(f"out must have shape {shape}, got {out.shape}")
+    if not return_error:
+        errors = None  # only running energies are kept
+    elif N is None:
+        errors = []  # per-segment (C, K, n) blocks, joined at the end
+    elif K == 1:
+        target = np.zeros(shape, dtype=err_dtype) if out is None else out
+        if out is not None:
+            # the loop writes samples M onwards; no extra pass over out
+            target[..., :M] = 0
+        errors = target[..., None, :] if batched else target[None, None, :]
+    else:
+        errors = np.zeros((C, K, N), dtype=err_dtype)
+
+    pruning = prune_interval is not None and K > 1
+    if pruning:
+        if prune_interval <= 0:
+            raise ValueError("prune_interval must be positive")
+        segment = -(-prune_interval // block) * block
+    elif errors is None or reader.chunked:
+        segment = -(-reader.chunk_size // block) * block
+    else:
+        segment = max(N - M, 1)
+
+    active = np.arange(K)
+    totals = np.zeros((C, K), dtype=np.float64)
+    updates = np.zeros((C, K), dtype=np.int64)
+    scratch = None
+    start = M
+
+    while True:
+        # window = [start - M, stop): M samples of tap history + new ones
+        d_win, u_win = reader.read(segment)
+        n = d_win.shape[-1] - M
+        if n <= 0:
+            break
+        d_win = d_win.reshape(C, -1)
+        u_win = u_win.reshape(C, -1)
+        stop = start + n
+        if isinstance(errors, np.ndarray) and len(active) == K:
+            # write straight into the result rows
+            buf = errors[..., start:stop]
+        else:
+            if scratch is None:
+                scratch = np.zeros((C, K, segment), dtype=err_dtype)
+            buf = scratch[:, :len(active), :n]
+        count = np.zeros((C, len(active)), dtype=np.int64)
+        run(d_win, u_win, coeffs, mus, M, M + n, buf, safe, bound, count)
+        updates[:, active] += count if bound else n
+        if isinstance(errors, list):
+            rows = np.zeros((C, K, n), dtype=err_dtype)
+            rows[:, active] = buf
+            errors.append(rows)
+        elif errors is not None and len(active) < K:
+            errors[:, active, start:stop] = buf
+        totals[:, active] += np.sum(np.square(buf, dtype=np.float64), axis=-1)
+        start = stop
+
+        if pruning:
+            # drop diverged and clearly losing candidates; a µ survives
+            # while it is still competitive on at least one channel
+            energy = totals[:, active]
+            alive = np.isfinite(energy)
+            if not alive.any():
+                break
+            best_energy = np.where(alive, energy, np.inf).min(axis=1)
+            keep = (alive & (energy <= prune_margin * best_energy[:, None])).any(axis=0)
+            if not keep.all():
+                active, coeffs, mus = active[keep], coeffs[:, keep], mus[keep]
+
+    if out is not None and N is not None and K == 1 and return_error:
+        target[..., start:] = 0  # samples the loop never reached
+    if isinstance(errors, list):
+        head = np.zeros((C, K, min(M, reader.total)), dtype=err_dtype)
+        errors = np.concatenate([head] + errors, axis=-1)
+        if K == 1:
+            length = errors.shape[-1]
+            if out is None:
+                target = errors[:, 0] if batched else errors[0, 0]
+            else:
+                target = out[..., :length]
+                target[...] = errors[:, 0] if batched else errors[0, 0]
+
+    if errors is None:
+        best_err = None
+    elif K == 1:
+        best_err = target
+    elif out is not None:
+        best_err = out if N is not None else out[..., :errors.shape[-1]]
+    else:
+        best_err = np.empty(errors.shape[::2] if batched else errors.shape[-1],
+                            dtype=err_dtype)
+    # per-channel rows of the result (a view for 1-D input)
+    err_rows = best_err if batched or best_err is None else best_err[None]
+
+    f0 = np.broadcast_to(filter_coeff, (C, M))
+    best_coeff = np.empty((C, M), dtype=f0.dtype)
+    best_mu = np.empty(C)
+    best_updates = np.zeros(C, dtype=np.int64)
+    for c in range(C):
+        # NaN/inf totals never win, matching a strict "<" against +inf
+        finite = np.flatnonzero(np.isfinite(totals[c, active]))
+        if len(finite) == 0:
+            if not batched:
+                return None, filter_coeff.copy(), mu_list[0]
+            # a diverged channel keeps its initial taps and a NaN error
+            best_coeff[c], best_mu[c] = f0[c], mu_list[0]
+            if err_rows is not None:
+                err_rows[c] = np.nan
+            continue
+        row = finite[np.argmin(totals[c, active][finite])]
+        best_coeff[c], best_mu[c] = coeffs[c, row], mu_list[active[row]]
+        best_updates[c] = updates[c, active[row]]
+        if err_rows is not None and K > 1:
+            err_rows[c] = errors[c, active[row]]
+
+    if stats is not None:
+        samples = max(start - M, 0)
+        counts = best_updates if batched else int(best_updates[0])
+        stats.update(samples=samples, updates=counts,
+                     update_ratio=counts / max(samples, 1))
+
+    if not batched:
+        return best_err, best_coeff[0], mu_list[active[row]]
+    return best_err, best_coeff, best_mu
+
+
+def _lms_time_domain(
+    desired_signal: np.ndarray,
+    reference_input: np.ndarray,
+    coeffs: np.ndarray,
+    mus: np.ndarray,
+    start: int,
+    stop: int,
+    errors: np.ndarray,
+    safe: bool,
+    bound: float,
+    updates: np.ndarray
+) -> None:
+    """
+    Sample-wise LMS over samples [start, stop) for C channels × K µ.
+
+    Signals are (C, n); coeffs (C, K, M) is updated in place; errors
+    (C, K, stop - start) receives the error of sample n in column
+    n - start. With bound > 0 only errors beyond ±bound update the
+    taps, by their excess over the bound, and updates (C, K) counts
+    those samples.
+    """
+    M = coeffs.shape[-1]
+
+    for n in range(start, stop):
+        # build reversed windows of reference_input[:, n-M+1 : n+1]
+        u_block = reference_input[:, n : n - M : -1]
+        y = np.matmul(coeffs, u_block[:, :, None])[..., 0]
+        err = desired_signal[:, n, None] - y
+        if safe:
+            err = np.clip(err, -1e4, 1e4)
+        errors[..., n - start] = err
+        if bound:
+            beyond = np.abs(err) > bound
+            if not beyond.any():
+                continue
+            updates += beyond
+            err = np.where(beyond, err - np.copysign(bound, err), 0)
+        # coeffs keep their dtype
+        coeffs += (mus * err)[..., None] * u_block[:, None, :]
+
+
+def _lms_block(
+    desired_signal: np.ndarray,
+    reference_input: np.ndarray,
+    coeffs: np.ndarray,
+    mus: np.ndarray,
+    start: int,
+    stop: int,
+    errors: np.ndarray,
+    safe: bool,
+    bound: float,
+    updates: np.ndarray,
+    *,
+    block_size: int
+) -> None:
+    """
+    Block LMS over samples [start, stop) with block length block_size.
+
+    The tap windows of all samples are a strided view of the reference
+    (no copy); each block's outputs for all K rows of coeffs are one
+    matrix product per channel, and the gradient summed over the block
+    is applied once at the end of the block. Shapes as in
+    _lms_time_domain.
+    """
+    M = coeffs.shape[-1]
+    # windows[c, i] = reference_input[c, start+i : start+i-M : -1]
+    windows = sliding_window_view(
+        np.asarray(reference_input[:, start - M + 1 : stop]), M, axis=-1
+    )[..., ::-1]
+
+    for block_start in range(0, stop - start, block_size):
+        block_stop = min(block_start + block_size, stop - start)
+        U = windows[:, block_start:block_stop]
+        y = coeffs @ U.transpose(0, 2, 1)
+        err = desired_signal[:, None, start + block_start : start + block_stop] - y
+        if safe:
+            err = np.clip(err, -1e4, 1e4)
+        errors[..., block_start:block_stop] = err
+        if bound:
+            err = _excess(err, bound, updates)
+            if err is None:
+                continue
+        coeffs += mus[:, None] * (err @ U)
+
+
+def _lms_fdaf(
+    desired_signal: np.ndarray,
+    reference_input: np.ndarray,
+    coeffs: np.ndarray,
+    mus: np.ndarray,
+    start: int,
+    stop: int,
+    errors: np.ndarray,
+    safe: bool,
+    bound: float,
+    updates: np.ndarray
+) -> None:
+    """
+    Overlap-save frequency-domain block LMS over samples [start, stop).
+
+    Each block covers M output samples. The input spectrum is taken over
+    the previous and current M reference samples (2M-point FFT), the
+    output is the last M samples of the circular convolution, and the
+    gradient is constrained to M taps before it is applied, so the
+    result is an exact block LMS with block length M. Each channel's
+    input FFT is shared by its K rows of coeffs, which are updated in
+    place; shapes as in _lms_time_domain.
+    """
+    C, K, M = coeffs.shape
+    n_fft = 2 * M
+    u = reference_input
+    d = desired_signal
+
+    frame = np.zeros((C, n_fft), dtype=coeffs.dtype)
+    e_pad = np.zeros((C, K, n_fft), dtype=coeffs.dtype)
+
+    for block_start in range(start, stop, M):
+        block_stop = min(block_start + M, stop)
+        L = block_stop - block_start
+
+        # frame = u[:, start-M : start+M], zero-padded past the last sample
+        frame[:, :M + L] = u[:, block_start - M : block_stop]
+        frame[:, M + L:] = 0.0
+        U = np.fft.rfft(frame, axis=-1)[:, None, :]
+
+        W = np.fft.rfft(coeffs, n_fft, axis=-1)
+        y = np.fft.irfft(U * W, n_fft, axis=-1)[..., M : M + L]
+        err = d[:, None, block_start:block_stop] - y
+        if safe:
+            err = np.clip(err, -1e4, 1e4)
+        errors[..., block_start - start : block_stop - start] = err
+        if bound:
+            err = _excess(err, bound, updates)
+            if err is None:
+                continue
+
+        # gradient = correlation of error with input, constrained to M taps
+        e_pad[..., M : M + L] = err
+        e_pad[..., M + L:] = 0.0
+        E = np.fft.rfft(e_pad, axis=-1)
+        grad = np.fft.irfft(np.conj(U) * E, n_fft, axis=-1)[..., :M]
+        coeffs += mus[:, None] * grad
+
+
+def _excess(err: np.ndarray, bound: float, updates: np.ndarray):
+    """
+    Set-membership error of a block engine: the part of err beyond
+    ±bound (zero inside); None if no sample of the block exceeds the
+    bound. A row with any sample beyond it applies the whole block
+    gradient, so it adds the block length to updates.
+    """
+    beyond = np.abs(err) > bound
+    hit = beyond.any(axis=-1)
+    if not hit.any():
+        return None
+    updates += hit * err.shape[-1]
+    return np.where(beyond, err - np.copysign(bound, err), 0).astype(err.dtype)
+
+
+_ENGINES = {
+    "time": _lms_time_domain,
+    "block": _lms_block,
+    "fdaf": _lms_fdaf,
+}
+
+
+class StreamingLMSFilter:
+    """
+    Stateful LMS filter for streaming or block processing.
+
+    Attributes
+    ----------
+    coeffs : np.ndarray, shape (M,)
+        Current filter taps. With engine="pbfdaf" this is a view of the
+        partitioned tap matrix, so it stays current after every block;
+        the filter runs on their spectra, which set_state() rebuilds, so
+        load new taps through set_state() rather than in place.
+    mu : float
+        Step size.
+    safe : bool
+        If True, clip each sample error to ±1e4.
+    engine : str
+        "time", "block" or "pbfdaf".
+    block_size : int or None
+        Block length for engine="block", partition length B for
+        engine="pbfdaf".
+
+    The time-domain engine keeps its reference history in a circular
+    buffer of length 2M in which every sample is stored twice, M apart,
+    so the newest-first window of the last M samples is always the
+    contiguous slice history[pos:pos + M]. Pushing a sample costs two
+    scalar stores, and process_block(..., out=buf) then runs without
+    allocating any array after the first call.
+    """
+
+    def __init__(
+        self,
+        num_taps: int,
+        mu: float,
+        safe: bool = False,
+        *,
+        engine: str = "time",
+        block_size: Optional[int] = None,
+        backend: str = "auto",
+        dtype: np.dtype = np.float32
+    ) -> None:
+        """
+        Parameters
+        ----------
+        num_taps : int
+            Number of filter taps (M).
+        mu : float
+            Step size.
+        safe : bool
+            Enable overflow-safe clipping.
+        engine : {"time", "block", "pbfdaf"}
+            "time" adapts one sample at a time. "block" is a block LMS:
+            each block's outputs are one matrix-vector product over a
+            strided window view of the reference history, and the summed
+            gradient is applied once per block. "pbfdaf" is a partitioned-
+            block frequency-domain filter (multi-delay filter, MDF): the
+            M taps are split into ceil(M / B) partitions of B taps (the
+            last one zero-padded and kept at M taps by the update), each
+            filtered with a 2B-point FFT against a delay line of input
+            spectra, and one constrained gradient step is taken per block.
+            The partition weights are kept in the frequency domain; the
+            constraint takes one inverse and one forward FFT per
+            partition and block. Latency is B samples instead of M, and
+            the cost per sample is O((M / B) · log B).
+        block_size : int, optional
+            For engine="block": update interval in samples (default: one
+            update per process_block call). For engine="pbfdaf": block
+            length B, required; blocks passed to process_block must then
+            be a multiple of B samples long.
+        backend : {"auto", "numpy", "numba"}
+            Kernel backend for engine="time" (see kernels.py).
+        dtype : np.float32 or np.float64
+            Precision of taps, history and error blocks.
+        """
+        if engine not in ("time", "block", "pbfdaf"):
+            raise ValueError(
+                f"unknown engine {engine!r}; "
+                "expected 'time', 'block' or 'pbfdaf'"
+            )
+        if block_size is not None and block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self.mu = mu
+        self.safe = safe
+        self.engine = engine
+        self.block_size = block_size
+        self.backend = backend
+        self.dtype = np.dtype(dtype)
+
+        if engine == "pbfdaf":
+            if block_size is None:
+                raise ValueError("engine='pbfdaf' needs a positive block_size")
+            B = block_size
+            P = -(-num_taps // B)
+            # partition p holds taps p*B … p*B+B-1
+            self._partitions = np.zeros((P, B), dtype=self.dtype)
+            self.coeffs = self._partitions.reshape(-1)[:num_taps]
+            # input spectra of the last P frames, newest first, and the
+            # partition weights (spectra of the zero-padded partitions)
+            self._spectra = np.zeros(
+                (P, B + 1), dtype=np.result_type(self.dtype, np.complex64)
+            )
+            self._weights = np.zeros_like(self._spectra)
+            # previous and current B reference samples
+            self._frame = np.zeros(2 * B, dtype=self.dtype)
+            self._err_pad = np.zeros(2 * B, dtype=self.dtype)
+        else:
+            self.coeffs = np.zeros(num_taps, dtype=self.dtype)
+            # last M reference samples, stored twice (see class docstring)
+            self._history = np.zeros(2 * num_taps, dtype=self.dtype)
+            self._pos = 0
+            self._work = np.zeros(num_taps, dtype=self.dtype)
+            # one-sample blocks for process_sample
+            self._ref1 = np.zeros(1, dtype=self.dtype)
+            self._des1 = np.zeros(1, dtype=self.dtype)
+            self._err1 = np.zeros(1, dtype=self.dtype)
+            self._kernel = get_kernel("lms_stream", backend)
+
+    @property
+    def _buffer(self) -> np.ndarray:
+        """Last M reference samples, newest first (a view)."""
+        M = len(self.coeffs)
+        return self._history[self._pos:self._pos + M]
+
+    def _set_buffer(self, newest_first: np.ndarray) -> None:
+        """Replace the reference history with newest_first (length M)."""
+        M = len(self.coeffs)
+        self._pos = 0
+        self._history[:M] = newest_first
+        self._history[M:] = newest_first
+
+    def process_block(
+        self,
+        reference_block: np.ndarray,
+        desired_block: np.ndarray,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Process a block of samples in streaming mode.
+
+        Parameters
+        ----------
+        reference_block : np.ndarray, shape (L,)
+            New reference samples u[n].
+        desired_block : np.ndarray, shape (L,)
+            New desired samples d[n].
+        out : np.ndarray, shape (L,), optional
+            Buffer that receives the error block and is returned, so a
+            caller reusing it avoids one allocation per block.
+
+        Returns
+        -------
+        error_block : np.ndarray, shape (L,)
+            Filter output error e[n] = d[n] – y[n].
+        """
+        L = len(desired_block)
+        if out is None:
+            error_block = np.zeros(L, dtype=self.dtype)
+        elif out.shape != (L,):
+            raise ValueError(f"out must have shape ({L},), got {out.shape}")
+        else:
+            error_block = out
+
+        if self.engine == "pbfdaf":
+            return self._process_block_pbfdaf(
+                reference_block, desired_block, error_block
+            )
+        if self.engine == "block":
+            return self._process_block_block(
+                reference_block, desired_block, error_block
+            )
+
+        return self._process_block_time(
+            reference_block, desired_block, error_block
+        )
+
+    def _process_block_time(
+        self,
+        reference_block: np.ndarray,
+        desired_block: np.ndarray,
+        error_block: np.ndarray
+    ) -> np.ndarray:
+        """Sample-wise path of process_block."""
+        if self._kernel is not None:
+            self._pos = self._kernel(
+                self._history, self._pos, self.coeffs, self.mu, self.safe,
+                np.asarray(reference_block), np.asarray(desired_block),
+                error_block
+            )
+            return error_block
+
+        for i in range(len(desired_block)):
+            error_block[i] = self._step(reference_block[i], desired_block[i])
+        return error_block
+
+    def _step(self, ref_sample: float, des_sample: float) -> float:
+        """One time-domain LMS update (NumPy path); returns the error."""
+        M = len(self.coeffs)
+        # shift in newest reference sample: the window moves back by one
+        pos = self._pos - 1 if self._pos else M - 1
+        self._history[pos] = ref_sample
+        self._history[pos + M] = ref_sample
+        self._pos = pos
+        window = self._history[pos:pos + M]
+
+        # filter output
+        y = float(np.dot(self.coeffs, window))
+        e = float(des_sample - y)
+        if self.safe:
+            e = min(max(e, -1e4), 1e4)
+
+        # update taps
+        np.multiply(window, self.mu * e, out=self._work)
+        self.coeffs += self._work
+        return e
+
+    def _process_block_block(
+        self,
+        reference_block: np.ndarray,
+        desired_block: np.ndarray,
+        error_block: np.ndarray
+    ) -> np.ndarray:
+        """Block LMS path of process_block."""
+        M = len(self.coeffs)
+        L = len(desired_block)
+        B = L if self.block_size is None else self.block_size
+
+        # oldest-first history of the previous M-1 samples + new block
+        x = np.concatenate((self._buffer[:M - 1][::-1],
+                            np.asarray(reference_block, dtype=self.dtype)))
+        windows = sliding_window_view(x, M)[:, ::-1]
+
+        for start in range(0, L, B):
+            stop = min(start + B, L)
+            U = windows[start:stop]
+            e = desired_block[start:stop] - U @ self.coeffs
+            if self.safe:
+                e = np.clip(e, -1e4, 1e4)
+            error_block[start:stop] = e
+            self.coeffs += self.mu * (e @ U)
+
+        self._set_buffer(x[:-M - 1:-1])
+        return error_block
+
+    def _process_block_pbfdaf(
+        self,
+        reference_block: np.ndarray,
+        desired_block: np.ndarray,
+        error_block: np.ndarray
+    ) -> np.ndarray:
+        """Partitioned-block frequency-domain path of process_block."""
+        B = self.block_size
+        L = len(desired_block)
+        if L % B:
+            raise ValueError(
+                f"block length {L} is not a multiple of block_size {B}"
+            )
+        frame = self._frame
+        spectra = self._spectra
+        W = self._weights
+        taps = self._partitions
+        # taps of the last partition that lie past num_taps
+        tail = len(self.coeffs) - (len(taps) - 1) * B
+        err_pad = self._err_pad
+
+        for start in range(0, L, B):
+            stop = start + B
+
+            # slide the input frame and push its spectrum on the delay line
+            frame[:B] = frame[B:]
+            frame[B:] = reference_block[start:stop]
+            spectra[1:] = spectra[:-1]
+            spectra[0] = np.fft.rfft(frame)
+
+            # output: sum of per-partition products, last B samples valid
+            y = np.fft.irfft((spectra * W).sum(axis=0), 2 * B)[B:]
+            e = desired_block[start:stop] - y
+            if self.safe:
+                e = np.clip(e, -1e4, 1e4)
+            error_block[start:stop] = e
+
+            # gradient per partition, constrained to its first B taps and,
+            # in the last partition, to num_taps
+            err_pad[B:] = e
+            E = np.fft.rfft(err_pad)
+            grad = np.fft.irfft(np.conj(spectra) * E, 2 * B, axis=1)
+            grad[:, B:] = 0
+            grad[-1, tail:] = 0
+            taps += self.mu * grad[:, :B]
+            W += self.mu * np.fft.rfft(grad, axis=1)
+
+        return error_block
+
+    def process_sample(self, ref_sample: float, des_sample: float) -> float:
+        """
+        Process a single sample (u[n], d[n]) and update state.
+
+        Only valid for engine="time" or "block" (or engine="pbfdaf" with
+        block_size=1). The time-domain NumPy path works on the scalars
+        directly; the other paths run a one-sample block through
+        preallocated buffers.
+
+        Returns
+        -------
+        e : float
+            The error sample.
+        """
+        if self.engine == "time" and self._kernel is None:
+            # round the inputs to the working precision like a block would
+            e = self._step(self.dtype.type(ref_sample),
+                           self.dtype.type(des_sample))
+            return float(self.dtype.type(e))
+
+        if self.engine == "pbfdaf":
+            return float(self.process_block(
+                np.array([ref_sample], dtype=self.dtype),
+                np.array([des_sample], dtype=self.dtype)
+            )[0])
+        self._ref1[0] = ref_sample
+        self._des1[0] = des_sample
+        return float(self.process_block(self._ref1, self._des1,
+                                        out=self._err1)[0])
+
+    # ─── State snapshots ────────────────────────────────────────────────────
+
+    # Snapshot kind and the kind's settings. Subclasses with their own
+    # settings override these three; the names must be constructor
+    # arguments, and _PARAMS packs them (in this order) into to_bytes().
+    _KIND = "lms"
+    _PARAM_NAMES: Tuple[str, ...] = ("mu",)
+    _PARAMS = struct.Struct("<d")
+
+    def _state_arrays(self) -> dict:
+        """The arrays that make up the adaptive state (live, not copies)."""
+        if self.engine == "pbfdaf":
+            # all partition taps, including the (zero) padding past
+            # num_taps, so the layout depends on block_size only
+            return {"coeffs": self._partitions.reshape(-1),
+                    "frame": self._frame,
+                    "spectra": self._spectra}
+        return {"coeffs": self.coeffs, "history": self._buffer}
+
+    def _pack_params(self) -> bytes:
+        """The _PARAM_NAMES settings in to_bytes() form."""
+        return self._PARAMS.pack(*(getattr(self, n) for n in self._PARAM_NAMES))
+
+    @classmethod
+    def _unpack_params(cls, data, offset: int) -> dict:
+        """Inverse of _pack_params."""
+        return dict(zip(cls._PARAM_NAMES, cls._PARAMS.unpack_from(data, offset)))
+
+    @classmethod
+    def _config(cls, state: dict) -> dict:
+        """
+        Constructor arguments (except backend) for a get_state()
+        snapshot; raises ValueError if it is of another filter kind.
+        """
+        kind = state.get("kind", "lms")
+        if kind != cls._KIND:
+            raise ValueError(
+                f"snapshot is of a {kind!r} filter, not {cls._KIND!r}"
+            )
+        config = {name: state[name] for name in cls._PARAM_NAMES}
+        config.update(num_taps=state["num_taps"], safe=state["safe"],
+                      engine=state["engine"], block_size=state["block_size"],
+                      dtype=state["dtype"])
+        return config
+
+    def get_state(self) -> dict:
+        """
+        Snapshot of the filter: its kind ("lms", or the subclass's), its
+        configuration including the kind's settings (mu for LMS), and
+        copies of its taps and reference history (for engine="pbfdaf":
+        the current input frame and the spectra delay line).
+
+        The dict only holds plain values and arrays, so it pickles and can
+        be passed to set_state() or from_state().
+        """
+        state = {"kind": self._KIND, "num_taps": len(self.coeffs)}
+        state.update((name, getattr(self, name)) for name in self._PARAM_NAMES)
+        state.update(
+            safe=self.safe,
+            engine=self.engine,
+            block_size=self.block_size,
+            dtype=self.dtype.name,
+        )
+        for name, array in self._state_arrays().items():
+            state[name] = array.copy()
+        return state
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restore a snapshot taken with get_state().
+
+        The snapshot must come from a filter of the same kind, num_taps,
+        engine and block_size; its settings (mu, …) and safe are taken
+        over and arrays are cast to this filter's dtype.
+        """
+        self._config(state)  # checks the kind
+        for key in ("engine", "block_size"):
+            if state[key] != getattr(self, key):
+                raise ValueError(
+                    f"snapshot has {key}={state[key]!r}, "
+                    f"filter has {getattr(self, key)!r}"
+                )
+        if state["num_taps"] != len(self.coeffs):
+            raise ValueError(
+                f"snapshot has {state['num_taps']} taps, "
+                f"filter has {len(self.coeffs)}"
+            )
+        for name in self._PARAM_NAMES:
+            setattr(self, name, state[name])
+        self.safe = state["safe"]
+        arrays = self._state_arrays()
+        if self.engine == "pbfdaf":
+            for name, array in arrays.items():
+                array[...] = state[name]
+            self._weights[...] = np.fft.rfft(
+                self._partitions, 2 * self.block_size, axis=1
+            )
+        else:
+            self.coeffs[:] = state["coeffs"]
+            self._set_buffer(state["history"])
+
+    @classmethod
+    def from_state(cls, state: dict, backend: str = "auto") -> "StreamingLMSFilter":
+        """
+        Build a filter from a get_state() snapshot of this class's kind
+        (ValueError otherwise).
+        """
+        filt = cls(backend=backend, **cls._config(state))
+        filt.set_state(state)
+        return filt
+
+    # binary snapshot: header (magic, version, kind code, engine code,
+    # dtype code, safe, num_taps, block_size or 0), the kind's settings
+    # (_PARAMS), then the raw _state_arrays() in order, little-endian
+    _MAGIC = b"LMSF"
+    _VERSION = 3
+    _HEADER = struct.Struct("<4sBBBBBII")
+    _KIND_CODES = ("lms", "nlms", "rls")
+    _ENGINE_CODES = ("time", "block", "pbfdaf")
+    _DTYPE_CODES = ("float32", "float64")
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact binary snapshot: a 17-byte header, the filter kind's
+        settings (mu for LMS) and the raw state arrays. Restore with
+        from_bytes() of the same class, e.g. after moving the bytes
+        through shared memory, a socket or a file.
+        """
+        header = self._HEADER.pack(
+            self._MAGIC, self._VERSION,
+            self._KIND_CODES.index(self._KIND),
+            self._ENGINE_CODES.index(self.engine),
+            self._DTYPE_CODES.index(self.dtype.name),
+            int(self.safe), len(self.coeffs), self.block_size or 0,
+        )
+        return header + self._pack_params() + b"".join(
+            np.ascontiguousarray(a).tobytes()
+            for a in self._state_arrays().values()
+        )
+
+    @classmethod
+    def _snapshot_kind(cls, data) -> Optional[str]:
+        """Filter kind of a to_bytes() snapshot; None if unrecognized."""
+        data = memoryview(data).cast("B")
+        if len(data) < cls._HEADER.size:
+            return None
+        magic, version, kind = cls._HEADER.unpack_from(data)[:3]
+        if (magic != cls._MAGIC or version != cls._VERSION
+                or kind >= len(cls._KIND_CODES)):
+            return None
+        return cls._KIND_CODES[kind]
+
+    @classmethod
+    def from_bytes(cls, data, backend: str = "auto") -> "StreamingLMSFilter":
+        """
+        Build a filter from a to_bytes() snapshot; data may be any
+        bytes-like object, e.g. a shared memory buffer. The snapshot
+        must be of this class's kind (ValueError otherwise).
+        """
+        data = memoryview(data).cast("B")
+        offset = cls._HEADER.size + cls._PARAMS.size
+        if len(data) < cls._HEADER.size:
+            raise ValueError("truncated LMS snapshot")
+        magic, version, kind, engine, dtype, safe, taps, block = (
+            cls._HEADER.unpack_from(data)
+        )
+        if magic != cls._MAGIC or version != cls._VERSION:
+            raise ValueError("not an LMS snapshot (or unsupported version)")
+        if (kind >= len(cls._KIND_CODES) or engine >= len(cls._ENGINE_CODES)
+                or dtype >= len(cls._DTYPE_CODES)):
+            raise ValueError(
+                f"not an LMS snapshot (kind code {kind}, engine code "
+                f"{engine}, dtype code {dtype})"
+            )
+        if cls._KIND_CODES[kind] != cls._KIND:
+            raise ValueError(
+                f"snapshot is of a {cls._KIND_CODES[kind]!r} filter, "
+                f"not {cls._KIND!r}"
+            )
+        if len(data) < offset:
+            raise ValueError("truncated LMS snapshot")
+        filt = cls(taps, safe=bool(safe), engine=cls._ENGINE_CODES[engine],
+                   block_size=block or None, backend=backend,
+                   dtype=cls._DTYPE_CODES[dtype],
+                   **cls._unpack_params(data, cls._HEADER.size))
+
+        arrays = filt._state_arrays()
+        size = offset + sum(a.nbytes for a in arrays.values())
+        if len(data) != size:
+            raise ValueError(
+                f"LMS snapshot has {len(data)} bytes, expected {size}"
+            )
+        state = filt.get_state()
+        for name, array in arrays.items():
+            state[name] = np.frombuffer(
+                data, array.dtype, array.size, offset
+            ).reshape(array.shape)
+            offset += array.nbytes
+        filt.set_state(state)
+        return filt
+
+    def save(self, path: str) -> None:
+        """Write to_bytes() to path atomically (temp file + rename)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, backend: str = "auto") -> "StreamingLMSFilter":
+        """Read a filter written by save()."""
+        with open(path, "rb") as fh:
+            return cls.from_bytes(fh.read(), backend=backend)
+
+    def __getstate__(self) -> dict:
+        # the compiled kernel is looked up again on unpickling
+        return dict(self.get_state(), backend=self.backend)
+
+    def __setstate__(self, state: dict) -> None:
+        state = dict(state)
+        backend = state.pop("backend")
+        self.__init__(backend=backend, **self._config(state))
+        self.set_state(state)
+
+
+class StreamingMISOLMSFilter:
+    """
+    Multi-input single-output streaming LMS: cancels the echo of C
+    loudspeaker channels (stereo, 5.1, …) from one microphone.
+
+    Every reference channel has its own M taps, and all channels adapt
+    together on the common error e[n] = d[n] - Σ_c f_c · u_c[n]. The tap
+    history is one contiguous (2M, C) array holding every frame twice, M
+    frames apart (as in StreamingLMSFilter), so the newest-first window
+    history[pos:pos + M] is a contiguous (M, C) block and each sample
+    costs one dot product and one fused update over all M·C taps.
+
+    Attributes
+    ----------
+    coeffs : np.ndarray, shape (M, C)
+        Current taps; column c filters reference channel c.
+    mu : float
+        Step size.
+    safe : bool
+        If True, clip each sample error to ±1e4.
+    engine : str
+        "time" or "block".
+    block_size : int or None
+        Update interval for engine="block".
+    """
+
+    def __init__(
+        self,
+        num_taps: int,
+        num_channels: int,
+        mu: float,
+        safe: bool = False,
+        *,
+        engine: str = "time",
+        block_size: Optional[int] = None,
+        dtype: np.dtype = np.float32
+    ) -> None:
+        """
+        Parameters
+        ----------
+        num_taps : int
+            Taps per reference channel (M).
+        num_channels : int
+            Number of reference channels (C).
+        mu : float
+            Step size.
+        safe : bool
+            Enable overflow-safe clipping.
+        engine : {"time", "block"}
+            "time" adapts one sample at a time; "block" computes each
+            block's outputs from a strided window view of the history
+            and applies the summed gradient once per block (see
+            StreamingLMSFilter).
+        block_size : int, optional
+            For engine="block": update interval in samples (default: one
+            update per process_block call).
+        dtype : np.float32 or np.float64
+            Precision of taps, history and error blocks.
+        """
+        if engine not in ("time", "block"):
+            raise ValueError(
+                f"unknown engine {engine!r}; expected 'time' or 'block'"
+            )
+        if block_size is not None and block_size <= 0:
+            raise ValueError("block_size must be positive")
+        self.mu = mu
+        self.safe = safe
+        self.engine = engine
+        self.block_size = block_size
+        self.dtype = np.dtype(dtype)
+
+        self.coeffs = np.zeros((num_taps, num_channels), dtype=self.dtype)
+        # last M reference frames, stored twice M frames apart
+        self._history = np.zeros((2 * num_taps, num_channels), dtype=self.dtype)
+        self._pos = 0
+        self._work = np.zeros_like(self.coeffs)
+
+    @property
+    def _buffer(self) -> np.ndarray:
+        """Last M reference frames, newest first, shape (M, C) (a view)."""
+        M = len(self.coeffs)
+        return self._history[self._pos:self._pos + M]
+
+    def process_block(
+        self,
+        reference_block: np.ndarray,
+        desired_block: np.ndarray,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Process a block of samples in streaming mode.
+
+        Parameters
+        ----------
+        reference_block : np.ndarray, shape (L, C)
+            New loudspeaker frames, one column per channel (the layout of
+            multichannel WAV data and sounddevice callbacks).
+        desired_block : np.ndarray, shape (L,)
+            New microphone samples d[n].
+        out : np.ndarray, shape (L,), optional
+            Buffer that receives the error block and is returned.
+
+        Returns
+        -------
+        error_block : np.ndarray, shape (L,)
+            Filter output error e[n] = d[n] – y[n].
+        """
+        M, C = self.coeffs.shape
+        L = len(desired_block)
+        if np.shape(reference_block) != (L, C):
+            raise ValueError(
+                f"reference_block must have shape ({L}, {C}), "
+                f"got {np.shape(reference_block)}"
+            )
+        if out is None:
+            error_block = np.zeros(L, dtype=self.dtype)
+        elif out.shape != (L,):
+            raise ValueError(f"out must have shape ({L},), got {out.shape}")
+        else:
+            error_block = out
+
+        if self.engine == "block":
+            return self._process_block_block(
+                reference_block, desired_block, error_block
+            )
+
+        history = self._history
+        coeffs = self.coeffs.reshape(-1)
+        work = self._work.reshape(-1)
+        for i in range(L):
+            # shift in the newest frame: the window moves back by one
+            pos = self._pos - 1 if self._pos else M - 1
+            history[pos] = reference_block[i]
+            history[pos + M] = reference_block[i]
+            self._pos = pos
+            window = history[pos:pos + M].reshape(-1)
+
+            # filter output over all channels at once
+            y = float(np.dot(coeffs, window))
+            e = float(desired_block[i] - y)
+            if self.safe:
+                e = min(max(e, -1e4), 1e4)
+            error_block[i] = e
+
+            # update all M·C taps
+            np.multiply(window, self.mu * e, out=work)
+            coeffs += work
+
+        return error_block
+
+    def _process_block_block(
+        self,
+        reference_block: np.ndarray,
+        desired_block: np.ndarray,
+        error_block: np.ndarray
+    ) -> np.ndarray:
+        """Block LMS path of process_block."""
+        M, C = self.coeffs.shape
+        L = len(desired_block)
+        B = L if self.block_size is None else self.block_size
+
+        # oldest-first history of the previous M-1 frames + new block
+        x = np.concatenate((self._buffer[:M - 1][::-1],
+                            np.asarray(reference_block, dtype=self.dtype)))
+        # windows[i] = frames i+M-1 … i, newest first, shape (L, M, C)
+        windows = sliding_window_view(x, M, axis=0)[..., ::-1].transpose(0, 2, 1)
+
+        for start in range(0, L, B):
+            stop = min(start + B, L)
+            U = windows[start:stop]
+            e = desired_block[start:stop] - np.einsum("lmc,mc->l", U, self.coeffs)
+            if self.safe:
+                e = np.clip(e, -1e4, 1e4)
+            error_block[start:stop] = e
+            self.coeffs += self.mu * np.einsum("l,lmc->mc", e, U)
+
+        self._pos = 0
+        self._history[:M] = x[:-M - 1:-1]
+        self._history[M:] = self._history[:M]
+        return error_block
+
+    def process_sample(
+        self,
+        ref_frame: np.ndarray,
+        des_sample: float
+    ) -> float:
+        """
+        Process one frame (u_1[n] … u_C[n], d[n]) and update state.
+
+        Returns
+        -------
+        e : float
+            The error sample.
+        """
+        return float(self.process_block(
+            np.asarray(ref_frame, dtype=self.dtype).reshape(1, -1),
+            np.array([des_sample], dtype=self.dtype)
+        )[0])
+
+
+class StreamingLMSFilterBank:
+    """
+    Many independent streaming LMS filters ("sessions", e.g. the call
+    legs of a conferencing server) stored as struct-of-arrays.
+
+    Session i lives in slot i of fixed-capacity arrays: its taps in
+    coeffs[i], its last M reference samples (newest first) in history[i]
+    and its step size in mus[i]. process_block handles one block for
+    every listed session in a single vectorized call: the sessions' rows
+    are gathered, adapted together (one set of array operations per
+    sample over all sessions, instead of one Python loop per session),
+    and scattered back. Slots of removed sessions go on a free list and
+    are reused by add_session, so the arrays are never reallocated.
+
+    Attributes
+    ----------
+    coeffs : np.ndarray, shape (capacity, M)
+        Taps of every slot.
+    history : np.ndarray, shape (capacity, M)
+        Last M reference samples of every slot, newest first.
+    mus : np.ndarray, shape (capacity,)
+        Step size of every slot.
+    active : np.ndarray of bool, shape (capacity,)
+        Which slots hold a session.
+    mu : float
+        Default step size for new sessions.
+    safe : bool
+        If True, clip each sample error to ±1e4.
+    engine : str
+        "time" or "block".
+    """
+
+    def __init__(
+        self,
+        num_taps: int,
+        capacity: int,
+        mu: float,
+        safe: bool = False,
+        *,
+        engine: str = "time",
+        dtype: np.dtype = np.float32
+    ) -> None:
+        """
+        Parameters
+        ----------
+        num_taps : int
+            Taps per session (M).
+        capacity : int
+            Maximum number of concurrent sessions.
+        mu : float
+            Default step size.
+        safe : bool
+            Enable overflow-safe clipping.
+        engine : {"time", "block"}
+            "time" adapts sample by sample, like StreamingLMSFilter's
+            time engine. "block" computes each block's outputs at once
+            and applies the summed gradient once per process_block call.
+        dtype : np.float32 or np.float64
+            Precision of taps, history and error blocks.
+        """
+        if engine not in ("time", "block"):
+            raise ValueError(
+                f"unknown engine {engine!r}; expected 'time' or 'block'"
+            )
+        self.mu = mu
+        self.safe = safe
+        self.engine = engine
+        self.dtype = np.dtype(dtype)
+
+        self.coeffs = np.zeros((capacity, num_taps), dtype=self.dtype)
+        self.history = np.zeros((capacity, num_taps), dtype=self.dtype)
+        self.mus = np.zeros(capacity, dtype=self.dtype)
+        self.active = np.zeros(capacity, dtype=bool)
+        # free slots, lowest on top
+        self._free = list(range(capacity - 1, -1, -1))
+        self._slots: Optional[np.ndarray] = None  # cached active_slots()
+
+    def __len__(self) -> int:
+        return len(self.active) - len(self._free)
+
+    def active_slots(self) -> np.ndarray:
+        """Slots of all current sessions, ascending."""
+        if self._slots is None:
+            self._slots = np.flatnonzero(self.active)
+        return self._slots
+
+    def add_session(
+        self,
+        mu: Optional[float] = None,
+        state: Optional[dict] = None
+    ) -> int:
+        """
+        Start a session in a free slot and return the slot.
+
+        Parameters
+        ----------
+        mu : float, optional
+            Step size (default: the bank's mu, or the snapshot's).
+        state : dict, optional
+            StreamingLMSFilter.get_state() snapshot (kind "lms", engine
+            "time" or "block", same num_taps) to resume from instead of
+            zeros.
+        """
+        if not self._free:
+            raise RuntimeError(
+                f"filter bank is full ({len(self.active)} sessions)"
+            )
+        if state is not None:
+            if state.get("kind", "lms") != "lms":
+                raise ValueError(
+                    f"cannot resume a {state['kind']!r} snapshot in an "
+                    "LMS filter bank"
+                )
+            if state["engine"] == "pbfdaf":
+                raise ValueError("cannot resume a pbfdaf snapshot in a filter bank")
+            if state["num_taps"] != self.coeffs.shape[1]:
+                raise ValueError(
+                    f"snapshot has {state['num_taps']} taps, "
+                    f"bank has {self.coeffs.shape[1]}"
+                )
+        slot = self._free.pop()
+        if state is None:
+            self.coeffs[slot] = 0
+            self.history[slot] = 0
+        else:
+            self.coeffs[slot] = state["coeffs"]
+            self.history[slot] = state["history"]
+            if mu is None:
+                mu = state["mu"]
+        self.mus[slot] = self.mu if mu is None else mu
+        self.active[slot] = True
+        self._slots = None
+        return slot
+
+    def remove_session(self, slot: int) -> None:
+        """End the session in slot and free the slot for reuse."""
+        if not self.active[slot]:
+            raise ValueError(f"slot {slot} holds no session")
+        self.active[slot] = False
+        self._free.append(slot)
+        self._slots = None
+
+    def session_state(self, slot: int) -> dict:
+        """
+        Snapshot of one session in StreamingLMSFilter.get_state() form
+        (engine "time"), e.g. to migrate it to a standalone filter.
+        """
+        if not self.active[slot]:
+            raise ValueError(f"slot {slot} holds no session")
+        return {
+            "kind": "lms",
+            "num_taps": self.coeffs.shape[1],
+            "mu": float(self.mus[slot]),
+            "safe": self.safe,
+            "engine": "time",
+            "block_size": None,
+            "dtype": self.dtype.name,
+            "coeffs": self.coeffs[slot].copy(),
+            "history": self.history[slot].copy(),
+        }
+
+    def process_block(
+        self,
+        reference_blocks: np.ndarray,
+        desired_blocks: np.ndarray,
+        slots: Optional[Sequence[int]] = None,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Process one block of every listed session.
+
+        Parameters
+        ----------
+        reference_blocks : np.ndarray, shape (K, L)
+            New reference samples, one row per session.
+        desired_blocks : np.ndarray, shape (K, L)
+            New desired samples, one row per session.
+        slots : sequence of int, optional
+            Session slot of each row (distinct). Default: all sessions,
+            in active_slots() order.
+        out : np.ndarray, shape (K, L), optional
+            Buffer that receives the error blocks and is returned.
+
+        Returns
+        -------
+        error_blocks : np.ndarray, shape (K, L)
+            Filter output errors, one row per session.
+        """
+        slots = self.active_slots() if slots is None else np.asarray(slots)
+        K, L = np.shape(desired_blocks)
+        if np.shape(reference_blocks) != (K, L) or len(slots) != K:
+            raise ValueError(
+                "reference_blocks, desired_blocks and slots must agree: "
+                f"{np.shape(reference_blocks)}, {(K, L)}, {len(slots)} slots"
+            )
+        if not self.active[slots].all() or len(np.unique(slots)) != K:
+            raise ValueError("slots must be distinct active sessions")
+        if out is None:
+            error_blocks = np.zeros((K, L), dtype=self.dtype)
+        elif out.shape != (K, L):
+            raise ValueError(f"out must have shape {(K, L)}, got {out.shape}")
+        else:
+            error_blocks = out
+
+        M = self.coeffs.shape[1]
+        # gather the sessions' state; taps are kept oldest-first during
+        # the block so they line up with forward (positive-stride)
+        # windows, which einsum reduces several times faster
+        taps = self.coeffs[slots][:, ::-1].copy()
+        mus = self.mus[slots]
+        # oldest-first history of the previous M-1 samples + new block
+        x = np.concatenate((self.history[slots, :M - 1][:, ::-1],
+                            np.asarray(reference_blocks, dtype=self.dtype)),
+                           axis=1)
+        # windows[k, i] = oldest-first tap window of sample i of session k
+        windows = sliding_window_view(x, M, axis=1)
+
+        if self.engine == "block":
+            e = desired_blocks - np.einsum("klm,km->kl", windows, taps)
+            if self.safe:
+                e = np.clip(e, -1e4, 1e4)
+            error_blocks[...] = e
+            taps += mus[:, None] * np.einsum("kl,klm->km", e, windows)
+        else:
+            for i in range(L):
+                U = windows[:, i]
+                e = desired_blocks[:, i] - np.einsum("km,km->k", taps, U)
+                if self.safe:
+                    e = np.clip(e, -1e4, 1e4)
+                error_blocks[:, i] = e
+                taps += (mus * e)[:, None] * U
+
+        # scatter it back
+        self.coeffs[slots] = taps[:, ::-1]
+        self.history[slots] = x[:, :-M - 1:-1]
+        return error_blocks
+
+
+# ─── Demo when run as script ────────────────────────────────────────────────
+if __name__ == "__main__":
+    print("▶ Running LMS demo…")
+
+    # synthetic signals
+    rng = np.random.default_rng(0)
+    N = 5000
+    clean = rng.standard_normal(N).astype(np.float32)
+    echo = np.concatenate((np.zeros(50), 0.6 * clean[:-50]))
+
+    # make an echoy desired signal
+    desired = clean + echo
+    reference = desired  # in practice, capture speaker output here
+
+    # Batch mode: sweep µ
+    init_coeffs = np.zeros(128, dtype=np.float32)
+    _, coeffs, mu = lms_filter_batch(
+        desired, reference, init_coeffs, [1e-4, 5e-4, 1e-3], safe=True
+    )
+    print(f"Batch mode → best µ: {mu:.1e}")
+
+    # Streaming mode: fixed µ
+    filt = StreamingLMSFilter(num_taps=128, mu=5e-4, safe=True)
+    err_block = filt.process_block(reference, desired)
+    print(f"Streaming mode → final total error: {np.sum(err_block**2):.2f}")
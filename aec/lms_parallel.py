@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lms_parallel.py – Process-pool µ sweeps for lms_filter_batch.
+
+Exports
+-------
+- lms_filter_batch_parallel: sweep µ over one or many recordings by
+  spreading (recording, µ) pairs across worker processes.
+
+Signals are handed to the workers through shared memory, so each
+recording is copied once into a shared block instead of being pickled
+for every task. Workers are spawned with their BLAS thread pools capped
+(default: one thread) so N workers do not oversubscribe the cores.
+"""
+
+import os
+import contextlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .lms import lms_filter_batch
+
+Result = Tuple[Optional[np.ndarray], np.ndarray, float]
+
+_BLAS_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+# shared blocks attached by this (worker) process, keyed by name
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def lms_filter_batch_parallel(
+    desired_signals: Union[np.ndarray, Sequence[np.ndarray]],
+    reference_inputs: Union[np.ndarray, Sequence[np.ndarray]],
+    filter_coeff: np.ndarray,
+    step_size: Union[float, Sequence[float]],
+    *,
+    max_workers: Optional[int] = None,
+    blas_threads: int = 1,
+    num_iterations: Optional[int] = None,
+    return_error: bool = True,
+    safe: bool = False,
+    engine: str = "time"
+) -> Union[Result, List[Result]]:
+    """
+    Parallel µ sweep with the same result as lms_filter_batch.
+
+    Parameters
+    ----------
+    desired_signals : np.ndarray or sequence of np.ndarray
+        One desired signal d[n], or one per recording.
+    reference_inputs : np.ndarray or sequence of np.ndarray
+        Matching reference signal(s) u[n].
+    filter_coeff : np.ndarray, shape (M,)
+        Initial filter taps, shared by all recordings.
+    step_size : float or sequence of floats
+        Candidate µ values; each (recording, µ) pair is one task.
+    max_workers : int, optional
+        Number of worker processes (default: os.cpu_count()).
+    blas_threads : int
+        BLAS/OpenMP threads allowed per worker.
+    num_iterations, return_error, safe, engine
+        As for lms_filter_batch.
+
+    Returns
+    -------
+    result : (err, best_coeff, best_mu) or list of them
+        A single tuple when one recording was given, otherwise one tuple
+        per recording, in input order. Each tuple matches what
+        lms_filter_batch returns for that recording: same best µ, and
+        taps/errors equal up to the rounding of the BLAS reductions
+        (workers run one µ per call, lms_filter_batch runs all µ
+        through one matrix-vector product).
+    """
+    single = isinstance(desired_signals, np.ndarray) and desired_signals.ndim == 1
+    if single:
+        desired_signals = [desired_signals]
+        reference_inputs = [reference_inputs]
+    if len(desired_signals) != len(reference_inputs):
+        raise ValueError("desired_signals and reference_inputs differ in length")
+
+    mu_list = [step_size] if np.ndim(step_size) == 0 else list(step_size)
+    options = dict(num_iterations=num_iterations, safe=safe, engine=engine)
+
+    blocks: List[shared_memory.SharedMemory] = []
+    try:
+        specs = []
+        for d, u in zip(desired_signals, reference_inputs):
+            spec, shm = _share_pair(np.asarray(d), np.asarray(u))
+            specs.append(spec)
+            blocks.append(shm)
+
+        workers = max_workers or os.cpu_count() or 1
+        ctx = mp.get_context("spawn")
+        with _blas_thread_limit(blas_threads), \
+                ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+            tasks = [(spec, filter_coeff, mu, options, None)
+                     for spec in specs for mu in mu_list]
+            chunk = max(1, len(tasks) // (4 * workers))
+            outcomes = list(pool.map(_sweep_task, tasks, chunksize=chunk))
+
+            # pick the winner per recording exactly as lms_filter_batch does
+            K = len(mu_list)
+            winners = []
+            for i in range(len(specs)):
+                best_total, best_k = np.inf, None
+                for k in range(K):
+                    total, _ = outcomes[i * K + k]
+                    if total < best_total:
+                        best_total, best_k = total, k
+                winners.append(best_k)
+
+            errors: List[Optional[np.ndarray]] = [None] * len(specs)
+            if return_error:
+                # second pass for the winning µ only, written straight
+                # into shared output blocks
+                reruns = []
+                for i, k in enumerate(winners):
+                    if k is None:
+                        continue
+                    n = specs[i][1]
+                    out = shared_memory.SharedMemory(create=True,
+                                                     size=max(4 * n, 1))
+                    blocks.append(out)
+                    reruns.append((i, out))
+                    errors[i] = np.ndarray(n, dtype=np.float32, buffer=out.buf)
+                list(pool.map(_sweep_task, [
+                    (specs[i], filter_coeff, mu_list[winners[i]], options,
+                     out.name)
+                    for i, out in reruns
+                ]))
+                errors = [None if e is None else e.copy() for e in errors]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    results: List[Result] = []
+    for i, k in enumerate(winners):
+        if k is None:
+            results.append((None, filter_coeff.copy(), mu_list[0]))
+        else:
+            coeff = outcomes[i * len(mu_list) + k][1]
+            results.append((errors[i], coeff, mu_list[k]))
+    return results[0] if single else results
+
+
+def _share_pair(
+    desired: np.ndarray,
+    reference: np.ndarray
+) -> Tuple[tuple, shared_memory.SharedMemory]:
+    """Copy (d, u) into one shared block; return its spec and the block."""
+    if len(desired) != len(reference):
+        raise ValueError("desired and reference signals differ in length")
+    dtype = np.result_type(desired, reference)
+    n = len(desired)
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(2 * n * dtype.itemsize, 1))
+    view = np.ndarray((2, n), dtype=dtype, buffer=shm.buf)
+    view[0] = desired
+    view[1] = reference
+    return (shm.name, n, dtype.str), shm
+
+
+def _attach(spec: tuple) -> np.ndarray:
+    """Map a shared (d, u) block into this process without copying."""
+    name, n, dtype = spec
+    shm = _attached.get(name)
+    if shm is None:
+        shm = _attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray((2, n), dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _sweep_task(task: tuple) -> Tuple[float, np.ndarray]:
+    """Run one (recording, µ) pair; return (total squared error, taps)."""
+    spec, filter_coeff, mu, options, out_name = task
+    pair = _attach(spec)
+    err, coeff, _ = lms_filter_batch(pair[0], pair[1], filter_coeff,
+                                     [mu], **options)
+    if err is None:
+        return np.inf, coeff
+    if out_name is not None:
+        out = shared_memory.SharedMemory(name=out_name)
+        try:
+            np.ndarray(len(err), dtype=np.float32, buffer=out.buf)[:] = err
+        finally:
+            out.close()
+    return float(np.sum(np.square(err, dtype=np.float64))), coeff
+
+
+@contextlib.contextmanager
+def _blas_thread_limit(threads: int) -> Iterator[None]:
+    """Cap BLAS threads for processes spawned inside the block."""
+    saved = {var: os.environ.get(var) for var in _BLAS_ENV_VARS}
+    os.environ.update({var: str(threads) for var in _BLAS_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+# ─── Demo when run as script ────────────────────────────────────────────────
+if __name__ == "__main__":
+    print("▶ Running parallel µ sweep demo…")
+
+    rng = np.random.default_rng(0)
+    files = []
+    for _ in range(4):
+        clean = rng.standard_normal(4000).astype(np.float32)
+        echo = np.concatenate((np.zeros(50), 0.6 * clean[:-50]))
+        files.append(clean + echo)
+
+    mus = [1e-4, 5e-4, 1e-3]
+    init_coeffs = np.zeros(128, dtype=np.float32)
+    results = lms_filter_batch_parallel(files, files, init_coeffs, mus,
+                                        safe=True)
+    for i, (_, _, mu) in enumerate(results):
+        serial = lms_filter_batch(files[i], files[i], init_coeffs, mus,
+                                  safe=True)[2]
+        print(f"file {i} → best µ: {mu:.1e} (serial: {serial:.1e})")
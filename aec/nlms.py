@@ -0,0 +1,543 @@
+import struct
+from bisect import bisect_left, insort
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .chunked import channel_shape, run_chunked
+from .kernels import get_kernel, per_channel
+from .lms import StreamingLMSFilter
+
+def nlms_filter(desired_signal, reference_input, filter_coeff, step_size=0.05, backend="auto", chunk_size=None, out=None, dtype=None):
+    """
+    NLMS (Normalized Least Mean Squares) adaptive filter implementation.
+
+    NLMS (Normalized LMS): Eine erweiterte Version des LMS, bei der die Schrittgröße normalisiert wird, um Stabilität bei verschiedenen Signalstärken zu gewährleisten.
+    
+    The variants ipnlms_filter, mmax_nlms_filter and sm_nlms_filter take the same
+    signals and chunking arguments.
+
+    Args:
+    - desired_signal: Desired output signal (d); an array, np.memmap or iterator of chunks,
+      of shape (N,) or (C, N) for C independent channels adapted in one pass
+    - reference_input: Input reference signal (u), of the same kind and shape as desired_signal
+    - filter_coeff: Initial filter coefficients (f), shape (M,) or per channel (C, M);
+      iterators of (C, n) chunks need (C, M)
+    - step_size: Step size for the NLMS algorithm (mu)
+    - backend: Kernel backend, "auto", "numpy" or "numba" (see kernels.py)
+    - chunk_size: Process the signals in chunks of this many samples, carrying the
+      filter state across chunks (np.memmap and iterator inputs are always chunked)
+    - out: Optional preallocated error buffer, e.g. a np.memmap
+    - dtype: Working precision (np.float32 or np.float64) of taps, signals and error;
+      default keeps filter_coeff's dtype and a float64 error
+
+    Returns:
+    - f_adaptive: Adapted filter coefficients, shape (M,) or (C, M)
+    - e: Error signal, shaped like desired_signal
+    """
+    f_adaptive, M, lead = _prepare(desired_signal, filter_coeff, dtype)
+    kernel = get_kernel("nlms", backend)
+    if lead:
+        run = per_channel(kernel, 1) if kernel else _nlms_run_batched
+    else:
+        run = kernel or _nlms_run
+    e = _run_chunks(run, desired_signal, reference_input, M, (f_adaptive, step_size),
+                    chunk_size, out, dtype)
+    return f_adaptive, e
+
+def ipnlms_filter(desired_signal, reference_input, filter_coeff, step_size=0.05, alpha=0.0, gain_block=32, backend="auto", chunk_size=None, out=None, dtype=None):
+    """
+    IPNLMS (improved proportionate NLMS) adaptive filter for sparse echo paths.
+
+    IPNLMS: Jeder Tap bekommt eine Schrittweite proportional zu seinem Betrag, sodass die
+    wenigen großen Taps eines dünnbesetzten Echopfads (Verzögerung, dann kurzer aktiver
+    Bereich) zuerst konvergieren.
+
+    Each tap's step is weighted by (1 - alpha) / 2M + (1 + alpha) / 2 · |f_k| / ||f||₁.
+    The gains are recomputed from the taps once every gain_block samples (in one
+    vectorized step) and held within the block.
+
+    Args:
+    - desired_signal, reference_input, filter_coeff, backend, chunk_size, out, dtype:
+      as for nlms_filter
+    - step_size: Normalized step size (mu)
+    - alpha: Proportionality, -1 <= alpha < 1; -1 is plain NLMS, 0 the usual choice
+    - gain_block: Samples between tap gain recomputations
+
+    Returns:
+    - f_adaptive: Adapted filter coefficients, shape (M,) or (C, M)
+    - e: Error signal, shaped like desired_signal
+    """
+    if not -1 <= alpha < 1:
+        raise ValueError(f"alpha must be in [-1, 1), got {alpha}")
+    if gain_block < 1:
+        raise ValueError(f"gain_block must be positive, got {gain_block}")
+    f_adaptive, M, lead = _prepare(desired_signal, filter_coeff, dtype)
+    run = get_kernel("ipnlms", backend) or _ipnlms_run
+    if lead:
+        run = per_channel(run, 2)
+    # [tap gains, samples since they were computed], carried across chunks
+    gains = np.zeros(lead + (M + 1,))
+    gains[..., M] = gain_block
+    e = _run_chunks(run, desired_signal, reference_input, M,
+                    (f_adaptive, gains, step_size, alpha, gain_block), chunk_size, out, dtype)
+    return f_adaptive, e
+
+def mmax_nlms_filter(desired_signal, reference_input, filter_coeff, partial_taps, step_size=0.05, backend="auto", chunk_size=None, out=None, dtype=None):
+    """
+    M-max NLMS: selective partial update of the K taps with the largest input.
+
+    M-max NLMS: Pro Sample werden nur die K Taps adaptiert, deren Eingangssamples gerade
+    den größten Betrag haben; die Rangfolge des Fensters wird inkrementell nachgeführt.
+
+    The normalization still uses the power of the whole window, but the ranking is kept
+    sorted incrementally (one removal and one insertion per sample), so the update costs
+    O(K) multiplies instead of O(M).
+
+    Args:
+    - desired_signal, reference_input, filter_coeff, backend, chunk_size, out, dtype:
+      as for nlms_filter
+    - partial_taps: Number of taps adapted per sample (K), 1 <= K <= M
+    - step_size: Normalized step size (mu)
+
+    Returns:
+    - f_adaptive: Adapted filter coefficients, shape (M,) or (C, M)
+    - e: Error signal, shaped like desired_signal
+    """
+    f_adaptive, M, lead = _prepare(desired_signal, filter_coeff, dtype)
+    if not 1 <= partial_taps <= M:
+        raise ValueError(f"partial_taps must be between 1 and {M}, got {partial_taps}")
+    run = get_kernel("nlms_mmax", backend) or _nlms_mmax_run
+    if lead:
+        run = per_channel(run, 1)
+    e = _run_chunks(run, desired_signal, reference_input, M,
+                    (f_adaptive, step_size, partial_taps), chunk_size, out, dtype)
+    return f_adaptive, e
+
+def sm_nlms_filter(desired_signal, reference_input, filter_coeff, error_bound, step_size=1.0, backend="auto", chunk_size=None, out=None, dtype=None, stats=None):
+    """
+    Set-membership NLMS: update the taps only where the error exceeds a bound.
+
+    Set-Membership NLMS: Samples mit |e| <= error_bound überspringen die Aktualisierung
+    (samt Leistungsberechnung) vollständig; nach der Konvergenz sind das die meisten.
+
+    The other samples adapt on the excess e - error_bound · sign(e), so with step_size=1
+    the a posteriori error lands on the bound. Pick the bound near the noise floor.
+
+    Args:
+    - desired_signal, reference_input, filter_coeff, backend, chunk_size, out, dtype:
+      as for nlms_filter
+    - error_bound: Error magnitude below which a sample is not adapted, >= 0
+    - step_size: Normalized step size (mu)
+    - stats: Optional dict, filled with "samples" (adapted samples per channel), "updates"
+      (samples that updated the taps, shape (C,) for 2-D input) and "update_ratio"
+
+    Returns:
+    - f_adaptive: Adapted filter coefficients, shape (M,) or (C, M)
+    - e: Error signal, shaped like desired_signal
+    """
+    if error_bound < 0:
+        raise ValueError(f"error_bound must be non-negative, got {error_bound}")
+    f_adaptive, M, lead = _prepare(desired_signal, filter_coeff, dtype)
+    run = get_kernel("nlms_sm", backend) or _sm_nlms_run
+    if lead:
+        run = per_channel(run, 2)
+    updates = np.zeros(lead + (1,), dtype=np.int64)
+    e = _run_chunks(run, desired_signal, reference_input, M,
+                    (f_adaptive, updates, step_size, error_bound), chunk_size, out, dtype)
+    if stats is not None:
+        samples = max(e.shape[-1] - M, 0)
+        counts = updates[..., 0] if lead else int(updates[0])
+        stats.update(samples=samples, updates=counts, update_ratio=counts / max(samples, 1))
+    return f_adaptive, e
+
+def _prepare(desired_signal, filter_coeff, dtype):
+    # working taps (one row per channel for 2-D signals), filter length and channel shape
+    f_adaptive = filter_coeff if dtype is None else np.asarray(filter_coeff, dtype=dtype)
+    M = np.shape(filter_coeff)[-1]
+    lead = channel_shape(desired_signal, filter_coeff)
+    if lead:
+        f_adaptive = np.broadcast_to(f_adaptive, lead + (M,)).copy()
+    return f_adaptive, M, lead
+
+def _run_chunks(run, desired_signal, reference_input, M, state, chunk_size, out, dtype):
+    return run_chunked(run, desired_signal, reference_input, M,
+                       state, chunk_size=chunk_size, out=out,
+                       dtype=np.float64 if dtype is None else dtype, input_dtype=dtype)
+
+def _nlms_run(desired_signal, reference_input, f_adaptive, step_size, e):
+    """Reference NLMS loop; adapts f_adaptive in place and fills e."""
+    M = len(reference_input)
+    
+    # Iterate through the signal and update filter
+    for l in range(len(f_adaptive), M):
+        u_block = reference_input[l:l - len(f_adaptive):-1]
+        y = np.dot(f_adaptive, u_block)
+        e[l] = desired_signal[l] - y
+        
+        # Normalize step size using the power of input signal
+        p = np.dot(u_block, u_block)
+        normalized_step_size = step_size / (p + 1)  # Adding 1 to avoid division by zero
+        
+        # Update filter coefficients
+        f_adaptive += normalized_step_size * e[l] * u_block
+
+def _nlms_run_batched(desired_signal, reference_input, f_adaptive, step_size, e):
+    """_nlms_run for C channels at once: signals and e are (C, n), f_adaptive is (C, M)."""
+    M = f_adaptive.shape[1]
+
+    for l in range(M, reference_input.shape[1]):
+        u_block = reference_input[:, l:l - M:-1]
+        y = np.einsum("cm,cm->c", f_adaptive, u_block)
+        e[:, l] = desired_signal[:, l] - y
+
+        p = np.einsum("cm,cm->c", u_block, u_block)
+        f_adaptive += (step_size / (p + 1) * e[:, l])[:, None] * u_block
+
+def _sm_nlms_run(desired_signal, reference_input, f_adaptive, updates, step_size, error_bound, e):
+    """Set-membership NLMS loop: like _nlms_run, but errors within ±error_bound skip the update."""
+    M = len(f_adaptive)
+
+    for l in range(M, len(reference_input)):
+        u_block = reference_input[l:l - M:-1]
+        e[l] = desired_signal[l] - np.dot(f_adaptive, u_block)
+        excess = abs(e[l]) - error_bound
+        if excess <= 0:
+            continue  # inside the bound: nothing to learn from this sample
+
+        updates[0] += 1
+        p = np.dot(u_block, u_block)
+        f_adaptive += step_size / (p + 1) * np.copysign(excess, e[l]) * u_block
+
+def _nlms_mmax_run(desired_signal, reference_input, f_adaptive, step_size, partial_taps, e):
+    """M-max NLMS loop: like _nlms_run, but only the partial_taps taps with the largest input are adapted."""
+    M = len(f_adaptive)
+    K = partial_taps
+    windows = sliding_window_view(reference_input, M)[:, ::-1]
+    u = reference_input.tolist()  # scalar reads from a list are much cheaper
+    # (|u(t)|, t) of the window, ascending; the last K entries are adapted
+    ranked = sorted((abs(u[t]), t) for t in range(M))
+    # sample times and inputs of the adapted taps (tap index l - t holds u(t));
+    # sample t sits at slot t % M of where (-1: not adapted)
+    top = np.array([t for _, t in ranked[M - K:]])
+    top_u = reference_input[top].astype(np.float64)
+    where = np.full(M, -1)
+    where[top % M] = np.arange(K)
+    taps = np.empty(K, dtype=np.intp)
+    power = 0.0
+
+    for l in range(M, len(u)):
+        # sample l enters slot l % M as sample l - M leaves it, so at most one adapted
+        # sample changes: the leaving one or the one across the boundary at M - K
+        s = l % M
+        i = bisect_left(ranked, (abs(u[l - M]), l - M))
+        del ranked[i]
+        entry = (abs(u[l]), l)
+        j = bisect_left(ranked, entry)
+        ranked.insert(j, entry)
+        if i >= M - K:
+            if j < M - K:
+                t = ranked[M - K][1]  # promoted to the adapted set
+                where[t % M] = where[s]
+                where[s] = -1
+                s = t % M
+            else:
+                t = l
+            top[where[s]] = t
+            top_u[where[s]] = u[t]
+        elif j >= M - K:
+            t = ranked[M - K - 1][1]  # pushed out of the adapted set
+            where[s] = where[t % M]
+            where[t % M] = -1
+            top[where[s]] = l
+            top_u[where[s]] = u[l]
+
+        u_block = windows[l - M + 1]
+        e[l] = err = desired_signal[l] - np.dot(f_adaptive, u_block)
+        if (l - M) % M:
+            power += u[l] * u[l] - u[l - M] * u[l - M]
+        else:
+            power = float(np.dot(u_block, u_block))  # exact every M samples, as the Numba kernel
+        np.subtract(l, top, out=taps)  # tap indices
+        f_adaptive[taps] += (step_size / (max(power, 0.0) + 1) * err) * top_u
+
+def fdnlms_filter(desired_signal, reference_input, filter_coeff, step_size=0.5, beta=0.9, delta=1.0, chunk_size=None, out=None, dtype=None):
+    """
+    Frequency-domain NLMS adaptive filter implementation.
+
+    FDNLMS: Block-NLMS im Frequenzbereich (Overlap-Save); die Schrittgröße wird für jedes
+    FFT-Bin mit der geglätteten Leistung dieses Bins normalisiert, was gefärbte Signale
+    wie Sprache spektral dekorreliert.
+
+    The signal is processed in blocks of M samples with 2M-point FFTs. Every block the
+    power of each input bin is smoothed, power = beta · power + (1 - beta) · |U|², and
+    the gradient conj(U) · E is divided by power + delta bin by bin before it is
+    constrained to M taps and applied.
+
+    Args:
+    - desired_signal: Desired output signal (d); an array, np.memmap or iterator of chunks,
+      of shape (N,) or (C, N) for C independent channels adapted in one pass
+    - reference_input: Input reference signal (u), of the same kind and shape as desired_signal
+    - filter_coeff: Initial filter coefficients (f), shape (M,) or per channel (C, M);
+      iterators of (C, n) chunks need (C, M)
+    - step_size: Step size (mu), 0 < mu < 2
+    - beta: Smoothing factor of the per-bin power, 0 <= beta < 1
+    - delta: Regularization added to every bin power
+    - chunk_size: Process the signals in chunks of this many samples, carrying taps and
+      bin powers across chunks; use a multiple of M to keep the block grid unchanged
+    - out: Optional preallocated error buffer, e.g. a np.memmap
+    - dtype: Working precision (np.float32 or np.float64) of taps, signals and error;
+      default keeps filter_coeff's dtype and a float64 error
+
+    Returns:
+    - f_adaptive: Adapted filter coefficients, shape (M,) or (C, M)
+    - e: Error signal, shaped like desired_signal
+    """
+    f_adaptive = filter_coeff if dtype is None else np.asarray(filter_coeff, dtype=dtype)
+    M = np.shape(filter_coeff)[-1]
+    lead = channel_shape(desired_signal, filter_coeff)
+    if lead:
+        f_adaptive = np.broadcast_to(f_adaptive, lead + (M,)).copy()
+    power = np.zeros(lead + (M + 1,))  # smoothed power of each rfft bin
+    e = run_chunked(_fdnlms_run, desired_signal, reference_input, M,
+                    (f_adaptive, power, step_size, beta, delta), chunk_size=chunk_size,
+                    out=out, dtype=np.float64 if dtype is None else dtype, input_dtype=dtype)
+    return f_adaptive, e
+
+def _fdnlms_run(desired_signal, reference_input, f_adaptive, power, step_size, beta, delta, e):
+    """Overlap-save FDNLMS on (..., n) signals; adapts f_adaptive and power in place and fills e."""
+    M = f_adaptive.shape[-1]
+    N = reference_input.shape[-1]
+    n_fft = 2 * M
+    frame = np.zeros(f_adaptive.shape[:-1] + (n_fft,), dtype=f_adaptive.dtype)
+    e_pad = np.zeros_like(frame)
+
+    for b in range(M, N, M):
+        stop = min(b + M, N)
+        L = stop - b
+
+        # Output = last L samples of the circular convolution over [b - M, stop)
+        frame[..., :M + L] = reference_input[..., b - M:stop]
+        frame[..., M + L:] = 0.0
+        U = np.fft.rfft(frame)
+        y = np.fft.irfft(U * np.fft.rfft(f_adaptive, n_fft), n_fft)[..., M:M + L]
+        e[..., b:stop] = desired_signal[..., b:stop] - y
+
+        # Smoothed bin power; bins without an estimate yet start from this block
+        bin_power = U.real ** 2 + U.imag ** 2
+        fresh = power == 0
+        power *= beta
+        power += (1 - beta) * bin_power
+        power[fresh] = bin_power[fresh]
+
+        # Gradient normalized per bin, then constrained to M taps
+        e_pad[..., M:M + L] = e[..., b:stop]
+        e_pad[..., M + L:] = 0.0
+        E = np.fft.rfft(e_pad)
+        f_adaptive += step_size * np.fft.irfft(np.conj(U) * E / (power + delta), n_fft)[..., :M]
+
+def _ipnlms_gains(f_adaptive, alpha):
+    """IPNLMS tap gains (summing to 1) for the taps f_adaptive."""
+    M = len(f_adaptive)
+    magnitude = np.abs(f_adaptive, dtype=np.float64)
+    norm = magnitude.sum()
+    proportional = magnitude / norm if norm > 0 else np.full(M, 1 / M)
+    return (1 - alpha) / (2 * M) + (1 + alpha) / 2 * proportional
+
+def _ipnlms_run(desired_signal, reference_input, f_adaptive, gains, step_size, alpha, gain_block, e):
+    """Reference IPNLMS loop; adapts f_adaptive and gains in place and fills e."""
+    M = len(f_adaptive)
+    N = len(reference_input)
+    reg = (1 - alpha) / (2 * M)  # nlms_filter's +1, scaled like the gains
+    windows = sliding_window_view(reference_input, M)[:, ::-1]
+    power = np.square(reference_input, dtype=np.float64)
+    g = gains[:M]
+
+    b = M
+    while b < N:
+        if gains[M] >= gain_block:
+            g[:] = _ipnlms_gains(f_adaptive, alpha)
+            gains[M] = 0
+        stop = min(b + gain_block - int(gains[M]), N)
+        # Gain-weighted input power Σ_k g_k u(l-k)² of every sample in the block at once
+        denom = np.convolve(power[b - M + 1:stop], g, "valid") + reg
+
+        for l in range(b, stop):
+            u_block = windows[l - M + 1]
+            e[l] = desired_signal[l] - np.dot(f_adaptive, u_block)
+            f_adaptive += (step_size * e[l] / denom[l - b]) * (g * u_block)
+        gains[M] += stop - b
+        b = stop
+
+class StreamingNLMSFilter(StreamingLMSFilter):
+    """
+    Streaming NLMS filter with the block API of StreamingLMSFilter.
+
+    Streaming NLMS: Die Eingangsleistung ||u||² wird rekursiv nachgeführt (neuestes Sample
+    dazu, ältestes Sample weg) statt für jedes Sample über alle M Taps neu summiert.
+
+    The update is the one of nlms_filter, f += mu / (||u||² + eps) * e * u. The power
+    ||u||² is kept in float64 and recomputed from the history every renorm_interval
+    samples so rounding drift of the recursion cannot accumulate. Taps, history,
+    snapshots (get_state, to_bytes, save, pickle) and the coefficient cache work as
+    for StreamingLMSFilter with engine="time"; snapshots are of kind "nlms" and also
+    carry eps, renorm_interval and partial_taps, and the power is rebuilt from the
+    history when a snapshot is restored.
+
+    With partial_taps = K only the K taps with the largest input magnitude are adapted
+    each sample (M-max NLMS, as in mmax_nlms_filter); the sorted ranking of the window is
+    updated incrementally and rebuilt from the history when a snapshot is restored.
+    This mode runs the NumPy path.
+
+    Args:
+    - num_taps: Number of filter taps (M)
+    - mu: Normalized step size, 0 < mu < 2
+    - safe: Clip each sample error to ±1e4
+    - eps: Regularization added to the input power (nlms_filter uses 1)
+    - renorm_interval: Samples between exact power recomputations (default M)
+    - partial_taps: Number of taps adapted per sample (M-max); None adapts all
+    - backend: Kernel backend, "auto", "numpy" or "numba" (see kernels.py)
+    - dtype: Precision of taps, history and error blocks
+    """
+
+    def __init__(self, num_taps, mu, safe=False, *, eps=1.0, renorm_interval=None,
+                 partial_taps=None, engine="time", block_size=None, backend="auto",
+                 dtype=np.float32):
+        if engine != "time" or block_size is not None:
+            raise ValueError("StreamingNLMSFilter only supports engine='time'")
+        if partial_taps is not None and not 1 <= partial_taps <= num_taps:
+            raise ValueError(f"partial_taps must be between 1 and {num_taps}, got {partial_taps}")
+        super().__init__(num_taps, mu, safe, backend=backend, dtype=dtype)
+        self.eps = eps
+        self.renorm_interval = num_taps if renorm_interval is None else renorm_interval
+        self.partial_taps = partial_taps
+        # [input power ||u||², samples since the last recomputation]
+        self._power = np.zeros(2)
+        self._kernel = get_kernel("nlms_stream", backend) if partial_taps is None else None
+        if partial_taps is not None:
+            self._rerank()
+
+    def _step(self, ref_sample, des_sample):
+        """One NLMS update (NumPy path); returns the error."""
+        M = len(self.coeffs)
+        power = self._power
+        # the oldest sample leaves the window, the newest one enters
+        oldest = float(self._history[self._pos + M - 1])
+        pos = self._pos - 1 if self._pos else M - 1
+        self._history[pos] = ref_sample
+        self._history[pos + M] = ref_sample
+        self._pos = pos
+        window = self._history[pos:pos + M]
+
+        newest = float(window[0])
+        power[1] += 1
+        if power[1] >= self.renorm_interval:
+            power[0] = float(np.dot(window, window))  # exact recomputation
+            power[1] = 0
+        else:
+            power[0] += newest * newest - oldest * oldest
+
+        y = float(np.dot(self.coeffs, window))
+        e = float(des_sample - y)
+        if self.safe:
+            e = min(max(e, -1e4), 1e4)
+
+        g = self.mu / (max(power[0], 0.0) + self.eps) * e
+        if self.partial_taps is None:
+            np.multiply(window, g, out=self._work)
+            self.coeffs += self._work
+            return e
+
+        # M-max: the newest sample enters the ranking, the oldest one leaves it
+        ranked = self._ranked
+        t = self._count
+        del ranked[bisect_left(ranked, (abs(oldest), t - M))]
+        insort(ranked, (abs(newest), t))
+        self._count = t + 1
+        selected = t - np.array([s for _, s in ranked[-self.partial_taps:]])  # tap indices
+        self.coeffs[selected] += g * window[selected]
+        return e
+
+    def _process_block_time(self, reference_block, desired_block, error_block):
+        """Sample-wise path of process_block."""
+        if self._kernel is None:
+            return super()._process_block_time(reference_block, desired_block, error_block)
+        self._pos = self._kernel(
+            self._history, self._pos, self.coeffs, self.mu, self.eps, self.safe,
+            self._power, self.renorm_interval,
+            np.asarray(reference_block), np.asarray(desired_block), error_block
+        )
+        return error_block
+
+    def _recompute_power(self):
+        """Recompute the input power from the history."""
+        window = self._buffer
+        self._power[:] = (float(np.dot(window, window)), 0)
+
+    def _rerank(self):
+        """Rebuild the M-max ranking (|u|, sample index) of the window from the history."""
+        window = self._buffer
+        self._count = 0  # index of the next sample; tap j holds sample -1 - j
+        self._ranked = sorted((abs(float(x)), -1 - j) for j, x in enumerate(window))
+
+    # snapshot kind and settings (see StreamingLMSFilter); partial_taps=None is stored as 0
+    _KIND = "nlms"
+    _PARAM_NAMES = ("mu", "eps", "renorm_interval", "partial_taps")
+    _PARAMS = struct.Struct("<ddII")
+
+    def _pack_params(self):
+        return self._PARAMS.pack(self.mu, self.eps, self.renorm_interval, self.partial_taps or 0)
+
+    @classmethod
+    def _unpack_params(cls, data, offset):
+        params = super()._unpack_params(data, offset)
+        params["partial_taps"] = params["partial_taps"] or None
+        return params
+
+    def set_state(self, state):
+        """
+        Restore a snapshot (see StreamingLMSFilter.set_state), including eps, renorm_interval
+        and partial_taps, and rebuild the power (and the M-max ranking) from the history.
+        """
+        super().set_state(state)
+        if self.partial_taps is not None and not 1 <= self.partial_taps <= len(self.coeffs):
+            raise ValueError(f"partial_taps must be between 1 and {len(self.coeffs)}, got {self.partial_taps}")
+        self._kernel = get_kernel("nlms_stream", self.backend) if self.partial_taps is None else None
+        self._recompute_power()
+        if self.partial_taps is not None:
+            self._rerank()
+
+if __name__ == "__main__":
+    # Beispiel-Test: Zufallsdaten für den NLMS-Filter
+    desired_signal = np.random.randn(1000)
+    reference_input = np.random.randn(1000)
+    filter_coeff = np.random.randn(10)  # Anfangswerte für Filterkoeffizienten
+
+    # Aufruf der NLMS-Funktion
+    f_adaptive, error = nlms_filter(desired_signal, reference_input, filter_coeff)
+
+    print(f_adaptive[:10], error[:10])  # Anzeige der ersten 10 Werte der Filterkoeffizienten und Fehler
+
+    # Dünnbesetzter Echopfad: Verzögerung, dann kurzer aktiver Bereich – NLMS gegen IPNLMS
+    rng = np.random.default_rng(0)
+    reference_input = rng.standard_normal(6000)
+    h = np.zeros(512)
+    h[200:240] = rng.standard_normal(40) * np.exp(-np.arange(40) / 8)
+    desired_signal = np.convolve(reference_input, h)[:6000]
+    for name, filt in (("NLMS", nlms_filter), ("IPNLMS", ipnlms_filter)):
+        f_adaptive, error = filt(desired_signal, reference_input, np.zeros(512), 0.5)
+        misalignment = np.sum((f_adaptive - h) ** 2) / np.sum(h ** 2)
+        print(f"{name}: misalignment {10 * np.log10(misalignment):.1f} dB")
+
+    # Gefärbtes Rauschen (AR(1)): NLMS gegen Frequenzbereichs-NLMS
+    white = rng.standard_normal(6000)
+    reference_input = np.empty(6000)
+    reference_input[0] = white[0]
+    for n in range(1, 6000):
+        reference_input[n] = 0.95 * reference_input[n - 1] + white[n]
+    h = rng.standard_normal(256) * np.exp(-np.arange(256) / 40)
+    desired_signal = np.convolve(reference_input, h)[:6000]
+    for name, filt in (("NLMS", nlms_filter), ("FDNLMS", fdnlms_filter)):
+        f_adaptive, error = filt(desired_signal, reference_input, np.zeros(256), 0.5)
+        misalignment = np.sum((f_adaptive - h) ** 2) / np.sum(h ** 2)
+        print(f"{name}: misalignment {10 * np.log10(misalignment):.1f} dB")
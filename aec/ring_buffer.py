@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ring_buffer.py – Lock-free single-producer/single-consumer audio FIFO.
+
+Exports
+-------
+- RingBuffer: preallocated NumPy ring buffer for passing audio between
+  two threads (e.g. PortAudio callbacks) without per-sample boxing or
+  per-block allocation, with zero-copy read views.
+
+Layout
+------
+The storage holds 2 × capacity frames and every frame is written twice,
+capacity frames apart (the same double-write trick as the tap history
+of StreamingLMSFilter). Any run of up to capacity unread frames is
+therefore one contiguous slice, so readers get plain views instead of
+two wrapped pieces.
+
+Threading
+---------
+The write and read positions are monotonically increasing frame
+counters; only the producer assigns the write position and only the
+consumer assigns the read position. Each side copies its data before
+publishing its new position with a single attribute store (atomic in
+CPython), so no lock is needed as long as there is exactly one producer
+thread and one consumer thread.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Single-producer/single-consumer FIFO of audio frames.
+
+    Attributes
+    ----------
+    capacity : int
+        Maximum number of unread frames.
+    dtype : np.dtype
+        Sample type.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        dtype: np.dtype = np.float32,
+        channels: Optional[int] = None
+    ) -> None:
+        """
+        Parameters
+        ----------
+        capacity : int
+            Maximum number of unread frames.
+        dtype : np.dtype
+            Sample type.
+        channels : int, optional
+            Samples per frame; None stores a 1-D stream of scalars.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        shape = (2 * capacity,) if channels is None else (2 * capacity, channels)
+        self._data = np.zeros(shape, dtype=self.dtype)
+        self._write_pos = 0  # frames written so far (producer only)
+        self._read_pos = 0   # frames consumed so far (consumer only)
+
+    def available(self) -> int:
+        """Frames written but not yet consumed."""
+        return self._write_pos - self._read_pos
+
+    def free(self) -> int:
+        """Frames that can be written without overrunning the reader."""
+        return self.capacity - self.available()
+
+    # ─── Producer side ──────────────────────────────────────────────────────
+
+    def write(self, frames: np.ndarray) -> int:
+        """
+        Append frames (cast to dtype) and return how many were written.
+
+        If fewer than len(frames) frames are free, only the leading part
+        that fits is written; the rest is dropped.
+        """
+        n = min(len(frames), self.free())
+        if n <= 0:
+            return 0
+        cap = self.capacity
+        data = self._data
+        start = self._write_pos % cap
+        stop = start + n  # <= 2 * cap
+
+        # primary copy, then the mirror of each half capacity frames away
+        data[start:stop] = frames[:n]
+        low = min(stop, cap)
+        data[start + cap:low + cap] = frames[:low - start]
+        if stop > cap:
+            data[:stop - cap] = frames[cap - start:n]
+
+        self._write_pos += n  # publish after the data is in place
+        return n
+
+    # ─── Consumer side ──────────────────────────────────────────────────────
+
+    def read_view(self, n: int) -> np.ndarray:
+        """
+        Contiguous view of the next n unread frames, without consuming
+        them. The view stays valid until advance() releases the frames.
+        """
+        if n > self.available():
+            raise ValueError(
+                f"only {self.available()} frames available, {n} requested"
+            )
+        start = self._read_pos % self.capacity
+        return self._data[start:start + n]
+
+    def advance(self, n: int) -> None:
+        """Consume n frames (e.g. after processing a read_view)."""
+        if n > self.available():
+            raise ValueError(
+                f"only {self.available()} frames available, {n} requested"
+            )
+        self._read_pos += n
+
+    def read(self, n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Copy the next n frames into out (or a new array) and consume them."""
+        view = self.read_view(n)
+        if out is None:
+            out = view.copy()
+        else:
+            out[...] = view
+        self.advance(n)
+        return out
+
+    def discard_to(self, n: int) -> None:
+        """Drop the oldest frames so that at most n remain unread."""
+        excess = self.available() - n
+        if excess > 0:
+            self.advance(excess)
@@ -0,0 +1,316 @@
+import struct
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .chunked import channel_shape, run_chunked
+from .kernels import get_kernel, per_channel
+from .lms import StreamingLMSFilter
+
+def rls_filter(desired_signal, reference_input, filter_coeff, reg_param, lambda_val=0.9, backend="auto", chunk_size=None, out=None, dtype=None, fast=False):
+    """
+    RLS (Recursive Least Squares) adaptive filter implementation.
+
+    RLS (Recursive Least Squares): Ein rekursiver Algorithmus, der eine inverse Korrelationsmatrix verwendet, um die Filterkoeffizienten schnell und präzise anzupassen.
+
+    The conventional recursion updates the M×M matrix P every sample, O(M²) time and
+    memory. With fast=True the same least-squares solution is tracked by a stabilized
+    fast transversal filter (FTF) in O(M) per sample: forward and backward linear
+    predictors of the reference update the gain vector instead of P, and the backward
+    prediction error, computed both from the predictor and from the gain, feeds their
+    difference back so rounding errors decay instead of growing. FTF starts from the
+    prewindowed state (the predictors adapt over the first M samples, the taps from
+    sample M on) with R = reg_param · diag(lambda_val^(M-1), …, 1) in place of
+    P = I / reg_param, so the first few hundred errors differ slightly from the
+    conventional recursion; afterwards both agree to rounding. Whenever the recursion
+    loses positivity (conversion factor outside (0, 1] or a negative prediction error
+    energy) the predictors are restarted from the last M samples; the taps are kept.
+    FTF needs lambda_val close to 1, about 1 - lambda_val < 1 / (2M), and keeps its
+    predictors in float64.
+    
+    Args:
+    - desired_signal: Desired output signal (d); an array, np.memmap or iterator of chunks,
+      of shape (N,) or (C, N) for C independent channels adapted in one pass
+    - reference_input: Input reference signal (u), of the same kind and shape as desired_signal
+    - filter_coeff: Initial filter coefficients (f); only its length M is used, and a
+      (C, M) array sets the channel count for iterators of (C, n) chunks
+    - reg_param: Regularization parameter for the inverse correlation matrix
+    - lambda_val: Forgetting factor (default is 0.9)
+    - backend: Kernel backend, "auto", "numpy" or "numba" (see kernels.py)
+    - chunk_size: Process the signals in chunks of this many samples, carrying w and P
+      across chunks (np.memmap and iterator inputs are always chunked)
+    - out: Optional preallocated error buffer, e.g. a np.memmap
+    - dtype: Working precision (np.float32 or np.float64, default float64) of w, P,
+      signals and error. In float32, P is re-symmetrized after every update so
+      rounding cannot drive it indefinite.
+    - fast: Use the O(M) stabilized fast transversal filter instead of updating P
+
+    Returns:
+    - f_adaptive: Adapted filter coefficients, shape (M,) or (C, M)
+    - error: Error between desired and estimated signal, shaped like desired_signal
+    """
+    f_len = np.shape(filter_coeff)[-1]
+    lead = channel_shape(desired_signal, filter_coeff)
+    
+    work = np.dtype(np.float64 if dtype is None else dtype)
+    if fast:
+        w = np.zeros(lead + (f_len,), dtype=work)
+        # rows: forward predictor, backward predictor, gain; all zero until the first window
+        predictors = np.zeros(lead + (3, f_len))
+        # [conversion factor, forward and backward prediction error energy]; 0 = not started
+        energies = np.zeros(lead + (3,))
+        run = get_kernel("ftf", backend) or _ftf_run
+        if lead:
+            run = per_channel(run, 3)
+        e = run_chunked(run, desired_signal, reference_input, f_len,
+                        (w, predictors, energies, lambda_val, reg_param, np.inf,
+                         _ftf_scratch(f_len)),
+                        chunk_size=chunk_size, out=out, dtype=work, input_dtype=dtype)
+        return w, e
+
+    P = (np.eye(f_len) / reg_param).astype(work)  # Inverse correlation matrix, initialized with regularization
+    P = np.broadcast_to(P, lead + P.shape).copy()  # one per channel
+    w = np.zeros(lead + (f_len,), dtype=work)  # Initial filter weights
+    symmetrize = work == np.float32
+
+    kernel = get_kernel("rls", backend)
+    if lead:
+        run = per_channel(kernel, 2) if kernel else _rls_run_batched
+    else:
+        run = kernel or _rls_run
+    e = run_chunked(run, desired_signal, reference_input, f_len,
+                    (w, P, lambda_val, symmetrize), chunk_size=chunk_size, out=out,
+                    dtype=work, input_dtype=dtype)  # Error signal
+    return w, e
+
+def _rls_run(desired_signal, reference_input, w, P, lambda_val, symmetrize, e):
+    """Reference RLS loop; updates w and P in place and fills e."""
+    f_len = len(w)
+    s_len = len(desired_signal)
+    
+    # Iterate through the signal and update filter
+    for l in range(f_len, s_len):
+        u_block = reference_input[l:l - f_len:-1]  # Take a block of reference input
+        k = np.dot(P, u_block) / (lambda_val + np.dot(u_block.T, np.dot(P, u_block)))  # Gain vector
+        prior_e = desired_signal[l] - np.dot(w.T, u_block)  # Prior estimation error
+        w += k * prior_e  # Update filter weights
+        P[:] = (1 / lambda_val) * (P - np.outer(k, np.dot(u_block.T, P)))  # Update inverse correlation matrix
+        if symmetrize:
+            P[:] = 0.5 * (P + P.T)  # Keep P symmetric despite rounding
+        e[l] = desired_signal[l] - np.dot(w.T, u_block)  # Final estimation error
+
+def _rls_run_batched(desired_signal, reference_input, w, P, lambda_val, symmetrize, e):
+    """_rls_run for C channels at once: signals and e are (C, n), w is (C, M), P is (C, M, M)."""
+    f_len = w.shape[1]
+
+    for l in range(f_len, desired_signal.shape[1]):
+        u_block = reference_input[:, l:l - f_len:-1]
+        Pu = np.matmul(P, u_block[:, :, None])[:, :, 0]
+        k = Pu / (lambda_val + np.einsum("cm,cm->c", u_block, Pu))[:, None]  # Gain vectors
+        prior_e = desired_signal[:, l] - np.einsum("cm,cm->c", w, u_block)
+        w += k * prior_e[:, None]
+        uP = np.matmul(u_block[:, None, :], P)[:, 0, :]
+        P[:] = (1 / lambda_val) * (P - k[:, :, None] * uP[:, None, :])
+        if symmetrize:
+            P[:] = 0.5 * (P + P.transpose(0, 2, 1))
+        e[:, l] = desired_signal[:, l] - np.einsum("cm,cm->c", w, u_block)
+
+def _ftf_scratch(f_len):
+    """Work buffer of the FTF loops: the order M+1 gain, a temporary and the warm-up window."""
+    return np.empty(4 * f_len + 1)
+
+def _ftf_predict(x_ext, predictors, energies, lambda_val, scratch):
+    """
+    Stabilized FTF time update of the predictors, the gain and the conversion factor for
+    the regressor x_ext = [u(n), …, u(n-M)]; returns False if the recursion lost positivity.
+    Works in place (scratch[:2M] holds the gain and a temporary), so it allocates no arrays.
+    """
+    wf, wb, phi = predictors
+    gamma, xi_f, xi_b = energies
+    M = len(phi)
+    gain = scratch[:M]
+    tmp = scratch[M:2 * M]
+
+    # forward prediction: order M+1 gain [0; phi] + g0 [1; -wf]
+    e_f = x_ext[0] - np.dot(wf, x_ext[1:])
+    g0 = e_f / (lambda_val * xi_f)
+    gain_last = phi[M - 1] - g0 * wf[M - 1]
+    gain[0] = g0
+    np.multiply(wf[:-1], -g0, out=gain[1:])
+    gain[1:] += phi[:-1]
+    gamma_inv = 1 / gamma + g0 * e_f
+    xi_f = lambda_val * xi_f + e_f * e_f * gamma
+    np.multiply(phi, e_f * gamma, out=tmp)
+    wf += tmp
+
+    # backward prediction error from the predictor and from the gain; mixing them with
+    # the weights 1.5 and 2.5 (Slock & Kailath) damps the propagation of their difference
+    e_b = x_ext[M] - np.dot(wb, x_ext[:M])
+    e_b_gain = lambda_val * xi_b * gain_last
+    gamma_inv -= gain_last * e_b
+    if not gamma_inv > 0:
+        return False
+    e_b1 = 1.5 * e_b - 0.5 * e_b_gain
+    e_b2 = 2.5 * e_b - 1.5 * e_b_gain
+    xi_b = lambda_val * xi_b + e_b2 * e_b2 / gamma_inv
+
+    np.multiply(wb, gain_last, out=phi)
+    phi += gain
+    np.multiply(phi, e_b1 / gamma_inv, out=tmp)
+    wb += tmp
+    denom = 1 + np.dot(phi, x_ext[:M])  # conversion factor, recomputed from the gain
+    if not denom > 0:
+        return False
+    energies[0] = 1 / denom
+    energies[1] = xi_f
+    energies[2] = xi_b
+    return energies[0] <= 1 and xi_f > 0 and xi_b > 0
+
+def _ftf_warmup(window, predictors, energies, lambda_val, reg_param, scratch):
+    """Restart the predictors as if the M samples of window (oldest first) followed silence."""
+    M = len(window)
+    predictors[:] = 0
+    energies[:] = (1, reg_param * lambda_val ** M, reg_param)
+    padded = scratch[2 * M:]
+    padded[:M + 1] = 0
+    padded[M + 1:] = window
+    for x_ext in sliding_window_view(padded, M + 1)[1:, ::-1]:
+        if not _ftf_predict(x_ext, predictors, energies, lambda_val, scratch):
+            predictors[:] = 0
+            energies[:] = (1, reg_param * lambda_val ** M, reg_param)
+            return
+
+def _ftf_run(desired_signal, reference_input, w, predictors, energies, lambda_val, reg_param, clip, scratch, e):
+    """
+    Stabilized fast transversal filter loop; updates w and the predictor state in place and
+    fills e. scratch is a _ftf_scratch(M) work buffer.
+    """
+    f_len = len(w)
+    s_len = len(desired_signal)
+    if s_len <= f_len:
+        return
+    # windows[l - M] = [u(l), …, u(l - M)]
+    windows = sliding_window_view(reference_input, f_len + 1)[:, ::-1]
+    phi = predictors[2]
+
+    if not 0 < energies[0] <= 1:
+        _ftf_warmup(reference_input[:f_len], predictors, energies, lambda_val, reg_param, scratch)
+    for l in range(f_len, s_len):
+        x_ext = windows[l - f_len]
+        if not _ftf_predict(x_ext, predictors, energies, lambda_val, scratch):
+            _ftf_warmup(reference_input[l - f_len + 1:l + 1], predictors, energies, lambda_val,
+                        reg_param, scratch)
+
+        prior_e = min(max(desired_signal[l] - np.dot(w, x_ext[:f_len]), -clip), clip)
+        post_e = prior_e * energies[0]  # a posteriori error
+        w += post_e * phi
+        e[l] = post_e
+
+class StreamingRLSFilter(StreamingLMSFilter):
+    """
+    Streaming RLS filter (stabilized fast transversal filter) with the block API of
+    StreamingLMSFilter.
+
+    Streaming RLS: Die schnelle Transversalfilter-Rekursion kostet O(M) pro Sample und
+    macht die RLS-Konvergenz damit auch für Echopfade mit über 1024 Taps bezahlbar.
+
+    The recursion is the one of rls_filter(..., fast=True), started from an all-zero
+    history, and the error block holds its a posteriori errors. Taps and history are kept
+    in dtype, the predictors in float64. Snapshots (get_state, to_bytes, save, pickle)
+    and the coefficient cache store taps and history as for StreamingLMSFilter with
+    engine="time"; they are of kind "rls", carry lambda_val and reg_param (there is no
+    mu) and also hold the forward and backward predictors, the gain and the energies
+    (conversion factor, prediction error energies), so a restored filter continues the
+    recursion where it stopped. Blocks run through preallocated buffers that grow to the
+    longest block seen, so process_sample allocates no arrays.
+
+    Args:
+    - num_taps: Number of filter taps (M)
+    - lambda_val: Forgetting factor, about 1 - lambda_val < 1 / (2M)
+    - safe: Clip each a priori error to ±1e4
+    - reg_param: Initial prediction error energy (regularization, as in rls_filter)
+    - backend: Kernel backend, "auto", "numpy" or "numba" (see kernels.py)
+    - dtype: Precision of taps, history and error blocks
+    """
+
+    def __init__(self, num_taps, lambda_val=0.999, safe=False, *, reg_param=1.0,
+                 engine="time", block_size=None, backend="auto", dtype=np.float32):
+        if engine != "time" or block_size is not None:
+            raise ValueError("StreamingRLSFilter only supports engine='time'")
+        super().__init__(num_taps, None, safe, backend=backend, dtype=dtype)  # no step size
+        self.lambda_val = lambda_val
+        self.reg_param = reg_param
+        self._predictors = np.zeros((3, num_taps))
+        self._energies = np.zeros(3)  # see rls_filter; 0 = rebuild from the history
+        self._scratch = _ftf_scratch(num_taps)
+        # rows: history + block of reference, desired and error samples
+        self._signals = np.zeros((3, num_taps + 1), dtype=self.dtype)
+        self._kernel = get_kernel("ftf", backend) or _ftf_run
+
+    # snapshot kind and settings (see StreamingLMSFilter)
+    _KIND = "rls"
+    _PARAM_NAMES = ("lambda_val", "reg_param")
+    _PARAMS = struct.Struct("<dd")
+
+    def _process_block_time(self, reference_block, desired_block, error_block):
+        """Runs the FTF loop over the history followed by the block."""
+        M = len(self.coeffs)
+        L = len(desired_block)
+        if self._signals.shape[1] < M + L:
+            self._signals = np.zeros((3, M + L), dtype=self.dtype)
+        reference, desired, e = self._signals[:, :M + L]
+        reference[:M] = self._buffer[::-1]
+        reference[M:] = reference_block
+        desired[M:] = desired_block
+        self._kernel(desired, reference, self.coeffs, self._predictors, self._energies,
+                     self.lambda_val, self.reg_param, 1e4 if self.safe else np.inf,
+                     self._scratch, e)
+        self._set_buffer(reference[:-M - 1:-1])
+        error_block[:] = e[M:]
+        return error_block
+
+    def _state_arrays(self):
+        """Taps and history, plus the predictor state of the FTF recursion."""
+        return dict(super()._state_arrays(), predictors=self._predictors,
+                    energies=self._energies)
+
+    def set_state(self, state):
+        """
+        Restore a snapshot (see StreamingLMSFilter.set_state), including lambda_val,
+        reg_param and the predictor state; the predictors of a snapshot without it
+        restart from the history.
+        """
+        super().set_state(state)
+        if "predictors" in state:
+            self._predictors[:] = state["predictors"]
+            self._energies[:] = state["energies"]
+        else:
+            self._energies[:] = 0
+
+if __name__ == "__main__":
+    # Beispiel-Test: Zufallsdaten für den RLS-Filter
+    desired_signal = np.random.randn(1000)
+    reference_input = np.random.randn(1000)
+    filter_coeff = np.random.randn(10)  # Anfangswerte für Filterkoeffizienten
+    reg_param = 0.1  # Regularisierungsparameter
+
+    # Aufruf der RLS-Funktion
+    f_adaptive, error = rls_filter(desired_signal, reference_input, filter_coeff, reg_param)
+
+    print(f_adaptive[:10], error[:10])  # Anzeige der ersten 10 Werte der Filterkoeffizienten und Fehler
+
+    # Konventionelles RLS (O(M²)) gegen die schnelle Transversalfilter-Rekursion (O(M))
+    import time
+
+    rng = np.random.default_rng(0)
+    N, M = 8000, 128
+    reference_input = np.convolve(rng.standard_normal(N), [1, 0.9])[:N]
+    h = rng.standard_normal(M) * np.exp(-np.arange(M) / 20)
+    desired_signal = np.convolve(reference_input, h)[:N] + 1e-3 * rng.standard_normal(N)
+
+    for fast in (False, True):
+        t0 = time.perf_counter()
+        f, _ = rls_filter(desired_signal, reference_input, np.zeros(M), 1.0, 0.999, fast=fast)
+        misalignment = np.sum((f - h) ** 2) / np.sum(h ** 2)
+        print(f"{'FTF' if fast else 'RLS':4s} misalignment {10 * np.log10(misalignment):7.1f} dB, "
+              f"{time.perf_counter() - t0:.2f} s")
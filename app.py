@@ -1,7 +1,6 @@
 import numpy as np
 import scipy.io.wavfile as wav
-import matplotlib.pyplot as plt
-from lms import lms_filter            # neu: kein _safe-Alias mehr
+from aec import lms_filter_batch, StreamingMISOLMSFilter
 
 # ------------------------------------------------------------
 # helpers
@@ -20,27 +19,33 @@ def process_wav_file(inp: str, out: str):
     fs, y = wav.read(inp)                # y is int16
     x = y.astype(np.float32) / 32768.0   # scale to ±1
 
-    # stereo → mono
-    if x.ndim == 2:
-        x = x.mean(axis=1)
-
     # LMS parameters
     f0 = np.zeros(1024, dtype=np.float32)
     mus = [1e-4, 5e-4, 1e-3]             # realistic μ list
 
-    e, *_ = lms_filter(
-        desired_signal=x,
-        reference_input=x,               # self-echo demo
-        filter_coeff=f0,
-        step_sizes=mus,
-        safe=True                        # clips err to ±1e4
-    )
+    if x.ndim == 2:
+        # stereo / multichannel: the mic hears the mix of all loudspeaker
+        # channels, so adapt one filter per channel (MISO) instead of
+        # averaging the reference down to mono
+        d = x.mean(axis=1)
+        miso = StreamingMISOLMSFilter(len(f0), x.shape[1], mus[1], safe=True)
+        e = miso.process_block(x, d)     # self-echo demo
+        x = d
+    else:
+        e, *_ = lms_filter_batch(
+            desired_signal=x,
+            reference_input=x,           # self-echo demo
+            filter_coeff=f0,
+            step_size=mus,
+            safe=True                    # clips err to ±1e4
+        )
 
     wav.write(out, fs, normalize_to_int16(e))
     return x, e, fs
 
 
 def plot_signals(orig, filt):
+    import matplotlib.pyplot as plt     # only needed for plotting
     plt.figure(figsize=(12, 5))
     plt.plot(orig,  label="Original")
     plt.plot(filt,  label="AEC output", alpha=0.7)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench.py – Throughput benchmarks for the adaptive filters.
+
+Run `python bench.py` to print, for each filter, the time per run and
+the speed relative to real time at FS, in float64 and float32, and the
+cost of many concurrent sessions in a StreamingLMSFilterBank versus one
+StreamingLMSFilter object per session. The cold-start import check lives
+in tests/test_import.py.
+"""
+
+import time
+from typing import Callable
+
+import numpy as np
+
+from aec import (apa_filter, fdnlms_filter, ipnlms_filter, lms_filter_batch,
+                 mmax_nlms_filter, nlms_filter, rls_filter, sm_nlms_filter,
+                 StreamingLMSFilter, StreamingLMSFilterBank)
+
+FS = 48000
+
+
+def _timeit(fn: Callable[[], object], repeat: int = 3) -> float:
+    """Best wall time of `repeat` runs (after one warm-up run)."""
+    fn()
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _report(name: str, seconds: float, n_samples: int) -> None:
+    print(f"{name:<44s} {seconds * 1e3:9.1f} ms   "
+          f"{n_samples / FS / seconds:8.1f}× real time")
+
+
+def bench_dtypes() -> None:
+    """float64 vs float32 for every filter."""
+    rng = np.random.default_rng(0)
+    N = 2 * FS
+    u = rng.standard_normal(N)
+    d = np.convolve(u, 0.1 * rng.standard_normal(256))[:N]
+
+    for dtype in (np.float64, np.float32):
+        name = np.dtype(dtype).name
+        ud, dd = u.astype(dtype), d.astype(dtype)
+
+        for engine, taps in (("time", 256), ("block", 1024), ("fdaf", 4096)):
+            f0 = np.zeros(taps, dtype=dtype)
+            t = _timeit(lambda: lms_filter_batch(
+                dd, ud, f0, 1e-4, engine=engine, dtype=dtype))
+            _report(f"lms_filter_batch {engine:<5s} M={taps:<5d} {name}", t, N)
+
+        def stream() -> None:
+            filt = StreamingLMSFilter(4096, 1e-5, engine="pbfdaf",
+                                      block_size=256, dtype=dtype)
+            for i in range(0, N, 1024):
+                filt.process_block(ud[i:i + 1024], dd[i:i + 1024])
+        _report(f"StreamingLMSFilter pbfdaf M=4096 {name}", _timeit(stream), N)
+
+        t = _timeit(lambda: nlms_filter(dd, ud, np.zeros(256), 0.5,
+                                        dtype=dtype))
+        _report(f"nlms_filter M=256 {name}", t, N)
+        t = _timeit(lambda: ipnlms_filter(dd, ud, np.zeros(256), 0.5,
+                                          dtype=dtype))
+        _report(f"ipnlms_filter M=256 {name}", t, N)
+        t = _timeit(lambda: sm_nlms_filter(dd, ud, np.zeros(256), 0.05,
+                                           dtype=dtype))
+        _report(f"sm_nlms_filter M=256 {name}", t, N)
+        t = _timeit(lambda: mmax_nlms_filter(dd, ud, np.zeros(1024), 64, 0.5,
+                                             dtype=dtype))
+        _report(f"mmax_nlms_filter M=1024 K=64 {name}", t, N)
+        t = _timeit(lambda: nlms_filter(dd, ud, np.zeros(1024), 0.5,
+                                        dtype=dtype))
+        _report(f"nlms_filter M=1024 {name}", t, N)
+        t = _timeit(lambda: fdnlms_filter(dd, ud, np.zeros(1024), 0.5,
+                                          dtype=dtype))
+        _report(f"fdnlms_filter M=1024 {name}", t, N)
+
+        for fast in (False, True):
+            label = "fast" if fast else "exact"
+            t = _timeit(lambda: apa_filter(dd, ud, np.zeros(256), 0.5, order=8,
+                                           fast=fast, dtype=dtype), repeat=1)
+            _report(f"apa_filter {label} M=256 P=8 {name}", t, N)
+
+        n_rls = FS // 4
+        t = _timeit(lambda: rls_filter(dd[:n_rls], ud[:n_rls], np.zeros(64),
+                                       0.1, 0.999, dtype=dtype), repeat=1)
+        _report(f"rls_filter M=64 {name}", t, n_rls)
+        t = _timeit(lambda: rls_filter(dd, ud, np.zeros(1024), 1.0, 0.9998,
+                                       dtype=dtype, fast=True), repeat=1)
+        _report(f"rls_filter fast M=1024 {name}", t, N)
+
+
+def bench_bank(sessions: int = 200, taps: int = 256) -> None:
+    """One 10 ms block for every session: filter bank vs separate objects."""
+    rng = np.random.default_rng(0)
+    L = FS // 100
+    u = rng.standard_normal((sessions, L)).astype(np.float32)
+    d = 0.5 * u
+
+    for engine in ("time", "block"):
+        bank = StreamingLMSFilterBank(taps, sessions, 1e-4, engine=engine)
+        for _ in range(sessions):
+            bank.add_session()
+        t = _timeit(lambda: bank.process_block(u, d))
+        _report(f"StreamingLMSFilterBank {engine:<5s} {sessions}×M={taps}", t, L)
+
+    filters = [StreamingLMSFilter(taps, 1e-4, backend="numpy")
+               for _ in range(sessions)]
+    t = _timeit(lambda: [f.process_block(u[k], d[k])
+                         for k, f in enumerate(filters)], repeat=1)
+    _report(f"{sessions} × StreamingLMSFilter time M={taps}", t, L)
+
+
+if __name__ == "__main__":
+    bench_dtypes()
+    bench_bank()
@@ -7,6 +7,12 @@ Uses `StreamingLMSFilter` to cancel speaker‑to‑mic echo. Replaces `aplay` wi
 a low‑latency SoundDevice output stream to avoid underruns, and adds a fixed
 reference delay to align the monitor signal with the mic echo path.
 
+Audio moves between the callbacks through preallocated lock-free ring
+buffers (see ring_buffer.py), so no callback allocates or boxes samples.
+
+Converged taps are cached on disk per audio-device setup (see
+coeff_cache.py), so the next launch on the same devices starts warm.
+
 Toggle AEC on/off with “m”.
 """
 
@@ -15,7 +21,6 @@ import sys
 import subprocess
 import venv
 import threading
-import queue
 import termios
 import tty
 
@@ -31,9 +36,13 @@ def ensure_venv_and_reexec():
         if not os.path.isdir(os.path.join(VENV_DIR, 'bin')):
             print("🚀 Creating virtual environment…")
             venv.EnvBuilder(with_pip=True).create(VENV_DIR)
-        print("📦 Installing/upgrading pip, numpy, sounddevice…")
+        print("📦 Installing/upgrading pip, numpy, sounddevice, numba…")
         subprocess.check_call([PIP_BIN, 'install', '--upgrade', 'pip'])
         subprocess.check_call([PIP_BIN, 'install', 'numpy', 'sounddevice'])
+        # numba compiles the sample-wise NLMS loop; optional, since it has
+        # no wheels yet for the newest Python releases
+        if subprocess.call([PIP_BIN, 'install', 'numba']) != 0:
+            print("⚠️  numba could not be installed; NLMS runs on NumPy")
         print("🔄 Re-launching inside virtual environment…")
         os.execv(PY_BIN, [PY_BIN] + sys.argv)
 
@@ -42,23 +51,51 @@ ensure_venv_and_reexec()
 # ─── IMPORTS & LMS FILTER ─────────────────────────────────────────────────────
 import numpy as np
 import sounddevice as sd
-from collections import deque
-from lms import StreamingLMSFilter
+from aec import StreamingLMSFilter, StreamingNLMSFilter
+from aec.coeff_cache import CacheWriter, CoefficientCache, fingerprint
+from aec.kernels import numba_available
+from aec.ring_buffer import RingBuffer
 
 # ─── CONFIGURATION ───────────────────────────────────────────────────────────
 FS                = 48000      # sample rate
 BLOCK             = 1024       # block size
+ALGORITHM         = "lms"      # "lms" (partitioned-block LMS) or "nlms"
 MU                = 5e-4       # LMS step size
+NLMS_MU           = 0.1        # NLMS normalized step size (0 < µ < 2)
+TAPS              = 4096       # echo tail length (filter taps)
+NUMPY_NLMS_TAPS   = 1024       # NLMS tail cap without numba (stays real time)
+PARTITION         = 256        # frequency-domain partition / block length
 BAR_WIDTH         = 40
 MAX_RMS           = 0.05
 REF_DELAY_BLOCKS  = 2          # delay reference by this many blocks
+CACHE_INTERVAL    = 10.0       # seconds between coefficient write-backs
 
 aec_enabled       = True
-monitor_buffer    = deque(maxlen=FS)     # ~1 s of monitor samples
-frames_queue      = queue.Queue(maxsize=128)
-
-# streaming LMS filter: BLOCK taps → matches block‐wise processing
-lms_filterer = StreamingLMSFilter(num_taps=BLOCK, mu=MU, safe=True)
+monitor_ring      = RingBuffer(FS)                   # ~1 s of monitor samples
+mic_ring          = RingBuffer(4 * BLOCK)            # mic samples awaiting a full block
+out_ring          = RingBuffer(16 * BLOCK, np.int16) # processed audio for the speaker
+
+# preallocated per-block work buffers (used by the mic callback only)
+err_block         = np.zeros(BLOCK, dtype=np.float32)
+pcm_block         = np.zeros(BLOCK, dtype=np.float32)
+
+if ALGORITHM == "nlms":
+    # sample-wise NLMS: the step is normalized by the reference power, so
+    # adaptation speed does not depend on the playback level. The NumPy
+    # loop needs ~0.65 s per second of audio at 4096 taps, so without
+    # numba the tail is shortened to keep real-time headroom.
+    if not numba_available() and TAPS > NUMPY_NLMS_TAPS:
+        print(f"⚠️  numba not installed: NLMS tail reduced to {NUMPY_NLMS_TAPS} taps")
+        TAPS = NUMPY_NLMS_TAPS
+    lms_filterer = StreamingNLMSFilter(num_taps=TAPS, mu=NLMS_MU, safe=True)
+else:
+    # partitioned-block frequency-domain LMS: TAPS-long tail, PARTITION
+    # latency; BLOCK must be a multiple of PARTITION
+    lms_filterer = StreamingLMSFilter(
+        num_taps=TAPS, mu=MU, safe=True, engine="pbfdaf", block_size=PARTITION
+    )
+coeff_cache  = CoefficientCache()
+cache_writer = None                      # started once the devices are known
 
 # ─── UTILS ───────────────────────────────────────────────────────────────────
 def print_volume_bar(rms: float):
@@ -71,44 +108,54 @@ def print_volume_bar(rms: float):
     sys.stdout.flush()
 
 # ─── AUDIO CALLBACKS ─────────────────────────────────────────────────────────
+# monitor callback = producer of monitor_ring; mic callback = producer of
+# mic_ring and out_ring and consumer of monitor_ring and mic_ring;
+# output callback = consumer of out_ring
 def monitor_callback(indata, frames, time_info, status):
     if status:
         print(f"\n[Monitor status] {status}")
-    monitor_buffer.extend(indata[:, 0].tolist())
+    monitor_ring.write(indata[:, 0])     # drops samples if the mic side stalls
 
 def mic_callback(indata, frames, time_info, status):
     if status:
         print(f"\n[Mic status] {status}")
 
-    mic = indata[:, 0].astype(np.float32)
-    rms = float(np.sqrt(np.mean(mic**2)))
+    mic_ring.write(indata[:, 0])
+    while mic_ring.available() >= BLOCK:
+        process_mic_block(mic_ring.read_view(BLOCK))
+        mic_ring.advance(BLOCK)
+
+def process_mic_block(mic: np.ndarray):
+    rms = float(np.sqrt(np.dot(mic, mic) / len(mic)))
     print_volume_bar(rms)
 
+    # monitor samples to keep unread: the reference block, REF_DELAY_BLOCKS
+    # newer blocks, and as many samples as the mic has buffered past this block
+    lag = (REF_DELAY_BLOCKS + 1) * BLOCK + mic_ring.available() - BLOCK
+
     # determine output block
-    if not aec_enabled or len(monitor_buffer) < (REF_DELAY_BLOCKS + 1) * BLOCK:
+    if not aec_enabled or monitor_ring.available() < lag:
         out = mic
     else:
-        # align reference by REF_DELAY_BLOCKS
-        start = - (REF_DELAY_BLOCKS + 1) * BLOCK
-        end   = - REF_DELAY_BLOCKS * BLOCK
-        ref_block = np.array(list(monitor_buffer)[start:end], dtype=np.float32)
-        out = lms_filterer.process_block(ref_block, mic)
-
-    # convert to int16 and enqueue
-    int_block = (np.clip(out, -1, 1) * 32767).astype(np.int16)
-    try:
-        frames_queue.put_nowait(int_block)
-    except queue.Full:
-        pass  # drop if queue is full
+        # align reference by REF_DELAY_BLOCKS, then take the oldest block
+        monitor_ring.discard_to(lag)
+        ref_block = monitor_ring.read_view(BLOCK)
+        out = lms_filterer.process_block(ref_block, mic, out=err_block)
+        monitor_ring.advance(BLOCK)
+        if cache_writer is not None:
+            cache_writer.offer(lms_filterer)  # file I/O runs off this thread
+
+    # scale to int16 range (the ring buffer casts) and enqueue
+    np.clip(out, -1, 1, out=pcm_block)
+    np.multiply(pcm_block, 32767, out=pcm_block)
+    out_ring.write(pcm_block)            # drops the block if the speaker side stalls
 
 def output_callback(outdata, frames, time_info, status):
     if status.output_underflow:
         print(f"\nOutput underflow at {time_info.outputBufferDacTime:.3f}")
-    try:
-        block = frames_queue.get_nowait()
-        outdata[:] = block.reshape(-1, 1)
-    except queue.Empty:
-        outdata.fill(0)
+    n = min(frames, out_ring.available())
+    out_ring.read(n, out=outdata[:n, 0])
+    outdata[n:].fill(0)
 
 # ─── KEY LISTENER ────────────────────────────────────────────────────────────
 def key_listener():
@@ -130,6 +177,17 @@ if __name__ == '__main__':
     print("🔊 Starting Live Echo Canceller with delay alignment")
     print("   Press 'm' to toggle AEC on/off, Ctrl+C to quit")
 
+    # warm-start from the taps cached for this device setup
+    cache_key = fingerprint(
+        sd.query_devices(kind='input')['name'],
+        sd.query_devices(kind='output')['name'],
+        fs=FS, taps=TAPS, partition=PARTITION, delay=REF_DELAY_BLOCKS,
+        algorithm=ALGORITHM
+    )
+    if coeff_cache.seed(lms_filterer, cache_key):
+        print("   Warm start: loaded cached filter taps for this setup")
+    cache_writer = CacheWriter(coeff_cache, cache_key, CACHE_INTERVAL)
+
     # start monitor (loopback) capture
     mon_stream = sd.InputStream(
         samplerate=FS, blocksize=BLOCK, channels=1, dtype='float32',
@@ -163,4 +221,5 @@ if __name__ == '__main__':
         mic_stream.stop(); mic_stream.close()
         mon_stream.stop(); mon_stream.close()
         out_stream.stop(); out_stream.close()
+        cache_writer.close(lms_filterer)  # write back the final taps
         print("\n🛑 Stopped.")
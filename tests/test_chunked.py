@@ -0,0 +1,32 @@
+"""Out-of-core runs: caller-supplied error buffers and memmapped signals."""
+
+import numpy as np
+import pytest
+
+from aec import lms_filter_batch
+
+N, M = 5000, 32
+
+
+@pytest.fixture(scope="module")
+def signals():
+    rng = np.random.default_rng(0)
+    u = rng.standard_normal(N).astype(np.float32)
+    d = np.convolve(u, 0.1 * rng.standard_normal(M))[:N].astype(np.float32)
+    return d, u
+
+
+@pytest.mark.parametrize("engine", ["time", "block", "fdaf"])
+def test_out_buffer_is_fully_written(signals, engine, tmp_path):
+    # a reused buffer holds stale data: every sample must be overwritten
+    d, u = signals
+    e, f, _ = lms_filter_batch(d, u, np.zeros(M), 1e-3, engine=engine)
+    out = np.lib.format.open_memmap(str(tmp_path / "e.npy"), mode="w+",
+                                    dtype=np.float32, shape=(N,))
+    out[:] = np.nan
+    e_out, f_out, _ = lms_filter_batch(d, u, np.zeros(M), 1e-3, engine=engine,
+                                       out=out, chunk_size=700)
+    assert e_out is out
+    np.testing.assert_array_equal(out, e)
+    np.testing.assert_array_equal(f_out, f)
+    assert not out[:M].any()
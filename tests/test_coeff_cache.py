@@ -0,0 +1,130 @@
+"""CoefficientCache: LRU caps, bad entries, seeding and the background writer."""
+
+import os
+
+import numpy as np
+import pytest
+
+from aec import (CacheWriter, CoefficientCache, StreamingLMSFilter,
+                 StreamingNLMSFilter)
+from aec.kernels import numba_available
+
+
+def _converged(cls=StreamingLMSFilter, taps=16, mu=0.05):
+    rng = np.random.default_rng(0)
+    filt = cls(taps, mu, backend="numpy", dtype=np.float64)
+    u = rng.standard_normal(2000)
+    filt.process_block(u, np.convolve(u, np.arange(1, taps + 1) / taps)[:2000])
+    return filt
+
+
+def _age(cache, key, seconds):
+    # recency is the file mtime; move it into the past
+    path = cache._path(key)
+    t = os.stat(path).st_mtime - seconds
+    os.utime(path, (t, t))
+
+
+def _entries(cache):
+    return sorted(name[:-4] for name in os.listdir(cache.directory))
+
+
+def test_round_trip(tmp_path):
+    cache = CoefficientCache(str(tmp_path))
+    filt = _converged()
+    cache.store("room", filt)
+    cached = cache.load("room", backend="numpy")
+    np.testing.assert_array_equal(cached.coeffs, filt.coeffs)
+    assert cache.load("other") is None
+
+
+def test_evicts_least_recently_used_beyond_max_entries(tmp_path):
+    cache = CoefficientCache(str(tmp_path), max_entries=2)
+    filt = _converged()
+    cache.store("a", filt)
+    cache.store("b", filt)
+    _age(cache, "a", 20)
+    _age(cache, "b", 10)
+    cache.load("a", backend="numpy")  # reading marks "a" as recent
+    cache.store("c", filt)
+    assert _entries(cache) == ["a", "c"]
+
+
+def test_evicts_beyond_max_bytes_but_keeps_newest(tmp_path):
+    filt = _converged()
+    size = len(filt.to_bytes())
+    cache = CoefficientCache(str(tmp_path), max_bytes=size + size // 2)
+    cache.store("a", filt)
+    _age(cache, "a", 10)
+    cache.store("b", filt)
+    assert _entries(cache) == ["b"]
+    cache.max_bytes = 1
+    cache.store("c", filt)
+    assert _entries(cache) == ["c"]
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data[:len(data) // 2],          # truncated
+    lambda data: data[:5] + b"\x09" + data[6:],  # bad kind code
+    lambda data: b"garbage",
+])
+def test_corrupt_entry_is_a_miss_and_removed(tmp_path, damage):
+    cache = CoefficientCache(str(tmp_path))
+    cache.store_bytes("room", damage(_converged().to_bytes()))
+    assert cache.load("room", backend="numpy") is None
+    assert _entries(cache) == []
+
+
+def test_caller_errors_keep_the_entry(tmp_path):
+    cache = CoefficientCache(str(tmp_path))
+    cache.store("room", _converged())
+    with pytest.raises(ValueError, match="backend"):
+        cache.load("room", backend="bogus")
+    if not numba_available():
+        with pytest.raises(ImportError):
+            cache.load("room", backend="numba")
+    # an LMS entry is a miss for an NLMS filter, not a corrupt entry
+    assert cache.load("room", cls=StreamingNLMSFilter) is None
+    nlms = StreamingNLMSFilter(16, 0.5, backend="numpy", dtype=np.float64)
+    assert not cache.seed(nlms, "room")
+    assert _entries(cache) == ["room"]
+    assert cache.load("room", backend="numpy") is not None
+
+
+def test_seed_copies_taps_and_keeps_settings(tmp_path):
+    cache = CoefficientCache(str(tmp_path))
+    source = _converged(StreamingNLMSFilter, mu=0.5)
+    cache.store("room", source)
+    filt = StreamingNLMSFilter(16, 0.1, eps=1e-3, backend="numpy",
+                               dtype=np.float64)
+    assert cache.seed(filt, "room")
+    np.testing.assert_array_equal(filt.coeffs, source.coeffs)
+    assert (filt.mu, filt.eps) == (0.1, 1e-3)
+
+
+def test_seed_rejects_other_layout(tmp_path):
+    cache = CoefficientCache(str(tmp_path))
+    cache.store("room", _converged(taps=16))
+    filt = StreamingLMSFilter(32, 0.05, backend="numpy")
+    assert not cache.seed(filt, "room")
+    assert not filt.coeffs.any()
+    block = StreamingLMSFilter(16, 0.05, engine="block", block_size=4,
+                               backend="numpy")
+    assert not cache.seed(block, "room")
+
+
+def test_cache_writer(tmp_path):
+    cache = CoefficientCache(str(tmp_path))
+    filt = _converged()
+    writer = CacheWriter(cache, "room", interval=3600)
+    assert not writer.offer(filt)  # interval not elapsed yet
+    writer.close(filt)  # the final state is always written
+    np.testing.assert_array_equal(cache.load("room", backend="numpy").coeffs,
+                                  filt.coeffs)
+
+    writer = CacheWriter(cache, "room", interval=0)
+    filt.coeffs[:] = 1
+    assert writer.offer(filt)
+    writer.close()
+    np.testing.assert_array_equal(cache.load("room", backend="numpy").coeffs,
+                                  filt.coeffs)
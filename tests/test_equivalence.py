@@ -0,0 +1,149 @@
+"""
+Equivalences the fast paths promise: fast recursions against their
+reference algorithms, chunked against single-pass runs, and the Numba
+kernels against the NumPy reference loops.
+"""
+
+import numpy as np
+import pytest
+
+from aec import (apa_filter, fdnlms_filter, ipnlms_filter, lms_filter_batch,
+                 mmax_nlms_filter, nlms_filter, rls_filter, sm_nlms_filter,
+                 StreamingLMSFilter, StreamingNLMSFilter, StreamingRLSFilter)
+from aec.kernels import numba_available
+
+needs_numba = pytest.mark.skipif(not numba_available(),
+                                 reason="Numba is not installed")
+BACKENDS = ["numpy", pytest.param("numba", marks=needs_numba)]
+
+N, M = 3000, 32
+
+
+@pytest.fixture(scope="module")
+def signals():
+    # colored input and a decaying echo path plus a little noise
+    rng = np.random.default_rng(0)
+    u = np.convolve(rng.standard_normal(N), [1, 0.8])[:N]
+    h = rng.standard_normal(M) * np.exp(-np.arange(M) / 8)
+    d = np.convolve(u, h)[:N] + 1e-3 * rng.standard_normal(N)
+    return d, u, h
+
+
+# name -> (filter call, chunked result exact?); calls return (taps, error)
+FILTERS = {
+    "nlms": (lambda d, u, **kw: nlms_filter(d, u, np.zeros(M), 0.5, **kw), True),
+    "ipnlms": (lambda d, u, **kw: ipnlms_filter(d, u, np.zeros(M), 0.5, **kw), True),
+    "set-membership": (lambda d, u, **kw: sm_nlms_filter(d, u, np.zeros(M), 0.01,
+                                                         0.5, **kw), True),
+    # the recursive input power restarts exactly at each chunk
+    "m-max": (lambda d, u, **kw: mmax_nlms_filter(d, u, np.zeros(M), 8, 0.5,
+                                                  **kw), False),
+    # R and Q are recomputed on a schedule that restarts at each chunk
+    "fap": (lambda d, u, **kw: apa_filter(d, u, np.zeros(M), 0.5, **kw), False),
+    "rls": (lambda d, u, **kw: rls_filter(d, u, np.zeros(M), 1.0, 0.99, **kw), True),
+    "ftf": (lambda d, u, **kw: rls_filter(d, u, np.zeros(M), 1.0, 0.995,
+                                          fast=True, **kw), True),
+    # lms_filter_batch returns (e, f, mu)
+    "lms": (lambda d, u, **kw: lms_filter_batch(
+        d, u, np.zeros(M), [1e-3, 5e-3], **kw)[1::-1], True),
+}
+
+
+def test_fap_matches_apa(signals):
+    d, u, _ = signals
+    f_apa, e_apa = apa_filter(d, u, np.zeros(M), 0.5, order=4, fast=False)
+    f_fap, e_fap = apa_filter(d, u, np.zeros(M), 0.5, order=4, backend="numpy")
+    np.testing.assert_allclose(f_fap, f_apa, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(e_fap, e_apa, rtol=0, atol=1e-12)
+
+
+def test_ftf_matches_rls_after_transient():
+    # the two start from different regularizations; that difference fades
+    # like λ^n, so compare once 0.995^n is far below rounding
+    rng = np.random.default_rng(1)
+    n = 8000
+    u = np.convolve(rng.standard_normal(n), [1, 0.8])[:n]
+    h = rng.standard_normal(16) * np.exp(-np.arange(16) / 4)
+    d = np.convolve(u, h)[:n] + 1e-3 * rng.standard_normal(n)
+    f_rls, e_rls = rls_filter(d, u, np.zeros(16), 1.0, 0.995, backend="numpy")
+    f_ftf, e_ftf = rls_filter(d, u, np.zeros(16), 1.0, 0.995, fast=True,
+                              backend="numpy")
+    np.testing.assert_allclose(e_ftf[6000:], e_rls[6000:], rtol=0, atol=1e-7)
+    np.testing.assert_allclose(f_ftf, f_rls, rtol=0, atol=1e-10)
+    assert np.max(np.abs(f_ftf - h)) < 1e-2
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_ftf_rescue_keeps_small_lambda_finite(signals, backend):
+    # λ = 0.9 is far below 1 - 1/(2M): the predictors must restart, not diverge
+    d, u, _ = signals
+    f, e = rls_filter(d, u, np.zeros(M), 1.0, 0.9, fast=True, backend=backend)
+    assert np.isfinite(f).all() and np.isfinite(e).all()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", FILTERS)
+def test_chunked_matches_single_pass(signals, name, backend):
+    d, u, _ = signals
+    run, exact = FILTERS[name]
+    f, e = run(d, u, backend=backend)
+    f_chunked, e_chunked = run(d, u, backend=backend, chunk_size=700)
+    if exact:
+        np.testing.assert_array_equal(f_chunked, f)
+        np.testing.assert_array_equal(e_chunked, e)
+    else:
+        np.testing.assert_allclose(f_chunked, f, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(e_chunked, e, rtol=0, atol=1e-12)
+
+
+def test_fdnlms_chunked_matches_single_pass(signals):
+    d, u, _ = signals
+    f, e = fdnlms_filter(d, u, np.zeros(M), 0.5)
+    f_chunked, e_chunked = fdnlms_filter(d, u, np.zeros(M), 0.5, chunk_size=7 * M)
+    np.testing.assert_array_equal(f_chunked, f)
+    np.testing.assert_array_equal(e_chunked, e)
+
+
+@needs_numba
+@pytest.mark.parametrize("name", FILTERS)
+def test_numba_matches_numpy(signals, name):
+    # kernels sum dot products sequentially, so agreement is to rounding
+    d, u, _ = signals
+    run, _ = FILTERS[name]
+    f_np, e_np = run(d, u, backend="numpy")
+    f_nb, e_nb = run(d, u, backend="numba")
+    np.testing.assert_allclose(f_nb, f_np, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(e_nb, e_np, rtol=0, atol=1e-12)
+
+
+@needs_numba
+@pytest.mark.parametrize("cls, args", [
+    (StreamingLMSFilter, (1e-3,)),
+    (StreamingNLMSFilter, (0.5,)),
+    (StreamingRLSFilter, (0.995,)),
+])
+def test_streaming_numba_matches_numpy(signals, cls, args):
+    d, u, _ = signals
+    errors = []
+    for backend in ("numpy", "numba"):
+        filt = cls(M, *args, backend=backend, dtype=np.float64)
+        errors.append(np.concatenate([
+            filt.process_block(u[i:i + 500], d[i:i + 500])
+            for i in range(0, N, 500)
+        ]))
+    np.testing.assert_allclose(errors[1], errors[0], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_streaming_rls_matches_batch(signals, backend):
+    # the streaming filter starts from an all-zero history
+    d, u, _ = signals
+    filt = StreamingRLSFilter(M, 0.995, reg_param=1.0, backend=backend,
+                              dtype=np.float64)
+    e = np.concatenate([filt.process_block(u[i:i + 500], d[i:i + 500])
+                        for i in range(0, N, 500)])
+    pad = np.zeros(M)
+    f_batch, e_batch = rls_filter(np.r_[pad, d], np.r_[pad, u], np.zeros(M),
+                                  1.0, 0.995, fast=True, backend=backend)
+    np.testing.assert_array_equal(filt.coeffs, f_batch)
+    np.testing.assert_array_equal(e, e_batch[M:])
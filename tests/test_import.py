@@ -0,0 +1,40 @@
+"""Cold-start cost and side effects of importing the aec package."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("numba", "scipy", "matplotlib", "sounddevice")
+BUDGET = 0.5  # seconds, best of REPEAT fresh interpreters
+REPEAT = 3
+
+
+@pytest.mark.parametrize("stmt", [
+    "import aec",
+    "from aec import lms_filter_batch",
+    "from aec import nlms_filter, sm_nlms_filter, rls_filter, StreamingNLMSFilter",
+    "from aec import StreamingRLSFilter",
+    "from aec import apa_filter",
+    "from aec import CoefficientCache, RingBuffer",
+])
+def test_import_is_cheap_and_silent(stmt):
+    # no import may run demo code, print, or pull in an optional dependency
+    probe = (
+        "import sys, time\n"
+        "t0 = time.perf_counter()\n"
+        f"{stmt}\n"
+        "t = time.perf_counter() - t0\n"
+        f"print(t, *[m for m in {HEAVY!r} if m in sys.modules])\n"
+    )
+    best = float("inf")
+    for _ in range(REPEAT):
+        out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        t, *loaded = out.stdout.split()
+        assert not loaded, f"{stmt!r} imported {loaded}"
+        assert not out.stderr, f"{stmt!r} wrote to stderr: {out.stderr}"
+        best = min(best, float(t))
+    assert best < BUDGET, f"{stmt!r} took {best:.3f} s"
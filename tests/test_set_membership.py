@@ -0,0 +1,40 @@
+"""Update statistics of set-membership adaptation."""
+
+import numpy as np
+import pytest
+
+from aec import lms_filter_batch, sm_nlms_filter
+
+N, M, BOUND = 8000, 32, 0.02
+
+
+@pytest.fixture(scope="module")
+def signals():
+    rng = np.random.default_rng(0)
+    u = rng.standard_normal(N)
+    h = rng.standard_normal(M) * np.exp(-np.arange(M) / 8)
+    d = np.convolve(u, h)[:N] + 0.01 * rng.standard_normal(N)
+    return d, u
+
+
+@pytest.mark.parametrize("engine, block", [("block", 16), ("fdaf", M)])
+def test_block_engines_count_updated_blocks(signals, engine, block):
+    # one sample beyond the bound applies the whole block gradient
+    d, u = signals
+    stats = {}
+    e, _, _ = lms_filter_batch(d, u, np.zeros(M), 0.01, engine=engine,
+                               block_size=block, error_bound=BOUND,
+                               dtype=np.float64, stats=stats)
+    blocks = np.abs(e[M:]).reshape(-1, block) > BOUND
+    assert stats["samples"] == N - M
+    assert stats["updates"] == block * blocks.any(axis=1).sum()
+    # the block count exceeds the count of samples beyond the bound
+    assert stats["updates"] > blocks.sum()
+
+
+def test_sample_wise_counts_samples_beyond_bound(signals):
+    d, u = signals
+    stats = {}
+    _, e = sm_nlms_filter(d, u, np.zeros(M), BOUND, stats=stats)
+    assert stats["updates"] == np.sum(np.abs(e[M:]) > BOUND)
+    assert 0 < stats["update_ratio"] < 1
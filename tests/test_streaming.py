@@ -0,0 +1,37 @@
+"""Streaming filter construction and block processing."""
+
+import numpy as np
+import pytest
+
+from aec import StreamingLMSFilter, StreamingMISOLMSFilter
+
+
+@pytest.mark.parametrize("engine", ["block", "pbfdaf"])
+@pytest.mark.parametrize("block_size", [0, -4])
+def test_rejects_non_positive_block_size(engine, block_size):
+    with pytest.raises(ValueError, match="block_size"):
+        StreamingLMSFilter(64, 1e-3, engine=engine, block_size=block_size)
+
+
+@pytest.mark.parametrize("block_size", [0, -4])
+def test_miso_rejects_non_positive_block_size(block_size):
+    with pytest.raises(ValueError, match="block_size"):
+        StreamingMISOLMSFilter(64, 2, 1e-3, engine="block",
+                               block_size=block_size)
+
+
+def test_pbfdaf_weights_track_the_taps():
+    # M = 100 is not a multiple of B: the last partition is zero-padded
+    rng = np.random.default_rng(0)
+    M, B = 100, 16
+    u = rng.standard_normal(20000)
+    h = rng.standard_normal(M) * np.exp(-np.arange(M) / 20)
+    d = np.convolve(u, h)[:len(u)]
+    filt = StreamingLMSFilter(M, 2e-3, engine="pbfdaf", block_size=B,
+                              dtype=np.float64)
+    for i in range(0, len(u), 4 * B):
+        filt.process_block(u[i:i + 4 * B], d[i:i + 4 * B])
+    assert not filt._partitions.reshape(-1)[M:].any()
+    np.testing.assert_allclose(np.fft.rfft(filt._partitions, 2 * B, axis=1),
+                               filt._weights, rtol=0, atol=1e-10)
+    assert np.sum((filt.coeffs - h) ** 2) < 1e-6 * np.sum(h ** 2)
@@ -0,0 +1,45 @@
+"""Steady-state allocation of the streaming time-domain loop."""
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from aec.kernels import numba_available
+from aec.lms import StreamingLMSFilter
+from aec.rls import StreamingRLSFilter
+
+needs_numba = pytest.mark.skipif(not numba_available(),
+                                 reason="Numba is not installed")
+
+
+# the NumPy FTF loop is a reference implementation: np.dot copies its
+# reversed float32 windows, so only the compiled RLS path is checked
+@pytest.mark.parametrize("backend, cls, param", [
+    ("numpy", StreamingLMSFilter, 1e-5),
+    pytest.param("numba", StreamingLMSFilter, 1e-5, marks=needs_numba),
+    pytest.param("numba", StreamingRLSFilter, 0.9999, marks=needs_numba),
+])
+def test_time_engine_does_not_allocate_per_block(backend, cls, param):
+    # with a reused out= buffer neither process_block nor process_sample
+    # may allocate an array; only a few small Python objects per call
+    taps = block = 4096
+    rng = np.random.default_rng(0)
+    reference = rng.standard_normal(block).astype(np.float32)
+    desired = 0.5 * reference
+    filt = cls(taps, param, safe=True, backend=backend)
+    out = np.zeros(block, dtype=np.float32)
+    filt.process_block(reference, desired, out=out)  # warm-up
+    filt.process_sample(reference[0], desired[0])
+
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        filt.process_block(reference, desired, out=out)
+        for i in range(64):
+            filt.process_sample(reference[i], desired[i])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    growth = peak - base
+    assert growth < taps * out.itemsize // 4, f"hot loop allocated {growth} B"